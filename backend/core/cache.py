@@ -0,0 +1,107 @@
+import threading, time
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from typing import Optional
+from .config import settings
+
+class TTLCache:
+  """Thread-safe LRU cache whose entries expire `ttl` seconds after they are stored.
+
+  Each key has an epoch that moves whenever the key is written or invalidated; a fill started under an older epoch
+  is dropped by `set`. Epochs of the least recently written keys are folded into a floor past `maxsize`, which can
+  only drop a fill, never admit a stale one.
+  """
+  def __init__(self, maxsize: int, ttl: float):
+    self.maxsize, self.ttl = maxsize, ttl
+    self._data = OrderedDict()
+    self._epochs = OrderedDict()
+    self._clock = self._floor = 0
+    self._lock = threading.Lock()
+
+  def epoch(self, key) -> int:
+    with self._lock: return self._epochs.get(key, self._floor)
+
+  def _bump(self, key):
+    self._clock += 1
+    self._epochs[key] = self._clock
+    self._epochs.move_to_end(key)
+    while len(self._epochs) > self.maxsize: self._floor = max(self._floor, self._epochs.popitem(last=False)[1])
+
+  def get(self, key):
+    with self._lock:
+      entry = self._data.get(key)
+      if entry is None: return None
+      value, expires = entry
+      if expires < time.monotonic():
+        del self._data[key]
+        return None
+      self._data.move_to_end(key)
+      return value
+
+  def set(self, key, value, epoch: int = None):
+    with self._lock:
+      if epoch is not None and epoch != self._epochs.get(key, self._floor): return
+      self._data[key] = (value, time.monotonic() + self.ttl)
+      self._data.move_to_end(key)
+      while len(self._data) > self.maxsize: self._data.popitem(last=False)
+
+  def update(self, key, fn):
+    """Replace a cached value with fn(value); values are never mutated in place, since readers hold them unlocked"""
+    with self._lock:
+      self._bump(key)
+      entry = self._data.get(key)
+      if entry is not None: self._data[key] = (fn(entry[0]), entry[1])
+
+  def invalidate(self, key):
+    with self._lock:
+      self._bump(key)
+      self._data.pop(key, None)
+
+  def clear(self):
+    with self._lock:
+      self._clock += 1
+      self._floor = self._clock
+      self._epochs.clear()
+      self._data.clear()
+
+class LikedSet:
+  """One user's likes as per-type sorted entity id arrays, with the like ids alongside; immutable once built"""
+  __slots__ = ("_ids", "_like_ids")
+
+  def __init__(self, rows):
+    grouped = defaultdict(list)
+    for entity_type, entity_id, like_id in rows: grouped[entity_type].append((entity_id, like_id))
+    self._ids, self._like_ids = {}, {}
+    for entity_type, pairs in grouped.items():
+      pairs.sort()
+      self._ids[entity_type] = [entity_id for entity_id, _ in pairs]
+      self._like_ids[entity_type] = [like_id for _, like_id in pairs]
+
+  def _find(self, entity_type: str, entity_id: str):
+    ids = self._ids.get(entity_type, [])
+    i = bisect_left(ids, entity_id)
+    return i, i < len(ids) and ids[i] == entity_id
+
+  def get(self, entity_type: str, entity_id: str) -> Optional[str]:
+    i, found = self._find(entity_type, entity_id)
+    return self._like_ids[entity_type][i] if found else None
+
+  def _with(self, entity_type: str, ids: list, like_ids: list) -> "LikedSet":
+    copy = LikedSet(())
+    copy._ids, copy._like_ids = {**self._ids, entity_type: ids}, {**self._like_ids, entity_type: like_ids}
+    return copy
+
+  def added(self, entity_type: str, entity_id: str, like_id: str) -> "LikedSet":
+    i, found = self._find(entity_type, entity_id)
+    ids, like_ids = self._ids.get(entity_type, []), self._like_ids.get(entity_type, [])
+    if found: return self._with(entity_type, ids, like_ids[:i] + [like_id] + like_ids[i + 1:])
+    return self._with(entity_type, ids[:i] + [entity_id] + ids[i:], like_ids[:i] + [like_id] + like_ids[i:])
+
+  def discarded(self, entity_type: str, entity_id: str) -> "LikedSet":
+    i, found = self._find(entity_type, entity_id)
+    if not found: return self
+    ids, like_ids = self._ids[entity_type], self._like_ids[entity_type]
+    return self._with(entity_type, ids[:i] + ids[i + 1:], like_ids[:i] + like_ids[i + 1:])
+
+principal_cache = TTLCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+liked_set_cache = TTLCache(settings.LIKED_SET_CACHE_SIZE, settings.LIKED_SET_TTL_SECONDS)
@@ -1,13 +1,59 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Optional
 
 class Settings(BaseSettings):
   DATABASE_URL: str
+  ASYNC_DATABASE_URL: Optional[str] = None
+  MAX_BATCH_IDS: int = 200
+  PLAYLIST_SUMMARY_COVERS: int = 4
+  CATALOG_CACHE_CONTROL: str = "public, max-age=60, must-revalidate"
+  PROFILE_CACHE_CONTROL: str = "private, no-cache"
+  REQUIRE_MIGRATED_SCHEMA: bool = True
+  DB_POOL_SIZE: int = 5
+  DB_MAX_OVERFLOW: int = 10
+  DB_POOL_TIMEOUT: float = 30.0
+  DB_POOL_RECYCLE: int = 1800
+  DB_PRE_PING: str = "idle"
+  DB_PRE_PING_IDLE_SECONDS: float = 30.0
   JWT_SECRET: str
   JWT_ALGORITHM: str = "HS256"
   ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
   REFRESH_TOKEN_EXPIRE_DAYS: int = 30
   FIREBASE_CREDENTIALS_PATH: str = "../../serviceaccountsecret.json"
+  COUNTER_SHARDS: int = 1
+  COUNTER_FLUSH_SECONDS: float = 5.0
+  FEED_FANOUT_MAX_FOLLOWERS: int = 5000
+  FEED_BACKFILL: int = 50
+  TRENDING_HALF_LIFE_HOURS: float = 48.0
+  PRINCIPAL_CACHE_SIZE: int = 10000
+  PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+  FOLLOW_GRAPH_REFRESH_SECONDS: float = 600.0
+  FOLLOW_GRAPH_COMPACT_AFTER: int = 10000
+  FOLLOW_SUGGESTION_FANOUT: int = 500
+  LIKED_SET_CACHE_SIZE: int = 5000
+  LIKED_SET_TTL_SECONDS: float = 30.0
+  LIKED_SET_MAX_LIKES: int = 20000
+  RECS_TOP_N: int = 50
+  RECS_SHRINKAGE: float = 10.0
+  RECS_BLOCK_ROWS: int = 2048
+  RECS_SEED_LIKES: int = 20
+  RATE_LIMIT_ENABLED: bool = True
+  RATE_LIMIT_BURST: float = 60.0
+  RATE_LIMIT_PER_SECOND: float = 2.0
+  RATE_LIMIT_MAX_CLIENTS: int = 100000
+  RATE_LIMIT_TRUST_FORWARDED: bool = False
+  SHED_MAX_IN_FLIGHT: int = 256
+  SHED_POOL_WAIT_MS: float = 250.0
+  BCRYPT_ROUNDS: int = 12
+  HASH_WORKERS: int = 2
+  HASH_QUEUE_LIMIT: int = 32
 
   model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
+  @property
+  def async_database_url(self) -> str:
+    if self.ASYNC_DATABASE_URL: return self.ASYNC_DATABASE_URL
+    scheme, rest = self.DATABASE_URL.split("://", 1)
+    return f"postgresql+asyncpg://{rest}" if scheme.startswith("postgres") else self.DATABASE_URL
+
 settings = Settings()
\ No newline at end of file
@@ -1,29 +1,52 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
+from typing import Optional
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from ..database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
 from .jwt import verify_token
-from ..repo.user_repo import get_user_by_id
+from .cache import principal_cache
+from ..repo.async_repo import get_user_by_id
+from ..schema.user import User
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_async_db)):
   token = credentials.credentials
   payload = verify_token(token)
   if not payload or payload.get("type") != "access":
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
   user_id = payload.get("sub")
-  user = get_user_by_id(db, user_id)
+  # the cache is per process: a principal is trusted for its TTL unless the token was issued for a newer users.version
+  cached = principal_cache.get(user_id)
+  if cached and cached[0] >= payload.get("ver", 0): return cached[1]
+  epoch = principal_cache.epoch(user_id)
+  user = await get_user_by_id(db, user_id)
   if not user:
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-  return user
+  principal = User.model_validate(user)
+  principal_cache.set(user_id, (user.version, principal), epoch)
+  return principal
+
+def expansions(*allowed: str):
+  def parse(expand: Optional[str] = Query(None, description=f"Comma-separated: {', '.join(allowed)}")) -> frozenset:
+    requested = frozenset(part.strip() for part in (expand or "").split(",") if part.strip())
+    unknown = requested - set(allowed)
+    if unknown:
+      raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown expand: {', '.join(sorted(unknown))}")
+    return requested
+  return parse
+
+async def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security), db: AsyncSession = Depends(get_async_db)):
+  if not credentials: return None
+  return await get_current_user(credentials, db)
 
-def require_admin(user = Depends(get_current_user)):
+async def require_admin(user = Depends(get_current_user)):
   if user.role != "admin":
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
   return user
 
-def require_curator(user = Depends(get_current_user)):
+async def require_curator(user = Depends(get_current_user)):
   if user.role not in ["curator", "admin"]:
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Curator access required")
   return user
\ No newline at end of file
@@ -0,0 +1,113 @@
+import threading
+from collections import defaultdict
+import numpy as np
+
+class FollowGraph:
+  """Follow edges as CSR arrays in both directions, plus add/remove overlays folded in once they grow"""
+
+  def __init__(self, edges=(), compact_after: int = 10000):
+    self._lock = threading.RLock()
+    self.compact_after = compact_after
+    pairs = np.array([tuple(edge) for edge in edges], dtype=object).reshape(-1, 2)
+    ids, codes = np.unique(pairs.ravel(), return_inverse=True)
+    self.ids = ids.tolist()
+    self.index = dict(zip(self.ids, range(len(self.ids))))
+    codes = codes.astype(np.int64).reshape(-1, 2)
+    self._build(codes[:, 0], codes[:, 1])
+
+  def _intern(self, user_id: str) -> int:
+    i = self.index.get(user_id)
+    if i is None:
+      i = self.index[user_id] = len(self.ids)
+      self.ids.append(user_id)
+    return i
+
+  @staticmethod
+  def _csr(rows, cols, n: int):
+    order = np.lexsort((cols, rows))
+    ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=ptr[1:])
+    return ptr, cols[order]
+
+  def _build(self, src, dst):
+    n = len(self.ids)
+    self._out, self._in = self._csr(src, dst, n), self._csr(dst, src, n)
+    self._added_out, self._added_in = defaultdict(set), defaultdict(set)
+    self._removed_out, self._removed_in = defaultdict(set), defaultdict(set)
+    self._pending = 0
+
+  def _neighbors(self, csr, added, removed, i: int):
+    ptr, idx = csr
+    base = idx[ptr[i]:ptr[i + 1]] if i < len(ptr) - 1 else idx[:0]
+    if removed.get(i): base = base[~np.isin(base, list(removed[i]))]
+    if added.get(i): base = np.union1d(base, list(added[i]))
+    return base
+
+  def _following(self, i: int):
+    return self._neighbors(self._out, self._added_out, self._removed_out, i)
+
+  def _followers(self, i: int):
+    return self._neighbors(self._in, self._added_in, self._removed_in, i)
+
+  def _compact(self):
+    n = len(self.ids)
+    ptr, idx = self._out
+    src, dst = np.repeat(np.arange(len(ptr) - 1, dtype=np.int64), np.diff(ptr)), idx
+    removed = [s * n + d for s, ds in self._removed_out.items() for d in ds]
+    if removed:
+      keep = ~np.isin(src * n + dst, removed)
+      src, dst = src[keep], dst[keep]
+    added = [(s, d) for s, ds in self._added_out.items() for d in ds]
+    if added:
+      extra = np.array(added, dtype=np.int64)
+      keys = np.unique(np.concatenate([src * n + dst, extra[:, 0] * n + extra[:, 1]]))
+      src, dst = keys // n, keys % n
+    self._build(src, dst)
+
+  def _track(self, on, off, s: int, d: int, on_reverse, off_reverse):
+    off[s].discard(d)
+    off_reverse[d].discard(s)
+    on[s].add(d)
+    on_reverse[d].add(s)
+    self._pending += 1
+    if self._pending >= self.compact_after: self._compact()
+
+  def add(self, follower_id: str, following_id: str):
+    with self._lock:
+      s, d = self._intern(follower_id), self._intern(following_id)
+      self._track(self._added_out, self._removed_out, s, d, self._added_in, self._removed_in)
+
+  def remove(self, follower_id: str, following_id: str):
+    with self._lock:
+      s, d = self._intern(follower_id), self._intern(following_id)
+      self._track(self._removed_out, self._added_out, s, d, self._removed_in, self._added_in)
+
+  def follows(self, follower_id: str, following_id: str) -> bool:
+    with self._lock:
+      s, d = self.index.get(follower_id), self.index.get(following_id)
+      if s is None or d is None: return False
+      following = self._following(s)
+      i = np.searchsorted(following, d)
+      return bool(i < len(following) and following[i] == d)
+
+  def mutuals(self, viewer_id: str, user_id: str, limit: int) -> list:
+    """Accounts the viewer follows that also follow `user_id`"""
+    with self._lock:
+      v, u = self.index.get(viewer_id), self.index.get(user_id)
+      if v is None or u is None: return []
+      shared = np.intersect1d(self._following(v), self._followers(u), assume_unique=True)
+      return [self.ids[i] for i in shared[:limit]]
+
+  def suggestions(self, user_id: str, limit: int, fanout: int) -> list:
+    """Two-hop accounts ranked by how many of the user's follows follow them, as (user_id, overlap)"""
+    with self._lock:
+      v = self.index.get(user_id)
+      if v is None: return []
+      mine = self._following(v)
+      hops = [self._following(int(u)) for u in mine[:fanout]]
+      if not hops: return []
+      candidates = np.concatenate(hops)
+      candidates = candidates[~np.isin(candidates, np.append(mine, v))]
+      found, counts = np.unique(candidates, return_counts=True)
+      top = np.lexsort((found, -counts))[:limit]
+      return [(self.ids[found[i]], int(counts[i])) for i in top]
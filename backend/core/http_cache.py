@@ -0,0 +1,17 @@
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+
+def etag(*parts) -> str:
+  return '"' + hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest() + '"'
+
+def versions(*objs) -> tuple:
+  return tuple((getattr(obj, "id", None) or obj.user_id, obj.version) for obj in objs if obj is not None)
+
+def conditional(request: Request, response: Response, tag: str, cache_control: str) -> Optional[Response]:
+  """Stamp validators on `response`; return a bare 304 when the client already holds `tag`"""
+  headers = {"ETag": tag, "Cache-Control": cache_control}
+  response.headers.update(headers)
+  held = {t.strip().removeprefix("W/") for t in request.headers.get("if-none-match", "").split(",")}
+  if tag in held or "*" in held: return Response(status_code=304, headers=headers)
+  return None
@@ -2,9 +2,10 @@ from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
 from .config import settings
 
-def create_access_token(subject: str):
+def create_access_token(subject: str, version: int = None):
   expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
   payload = {"sub": subject, "exp": expire, "type": "access"}
+  if version is not None: payload["ver"] = version
   return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
 def create_refresh_token(subject: str):
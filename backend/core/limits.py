@@ -0,0 +1,104 @@
+import json, math, re, threading, time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from .config import settings
+from .jwt import verify_token
+from .pool import InstrumentedAsyncQueuePool
+
+# (method, path pattern, token cost); first match wins, unmatched requests cost 1 and cost 0 is never limited or shed
+ROUTE_COSTS = [
+  ("GET", re.compile(r"^/(health(/pool)?)?$"), 0),
+  ("POST", re.compile(r"^/auth/local/(login|register)$"), 10),
+  ("POST", re.compile(r"^/auth/(firebase|refresh)$"), 5),
+  ("GET", re.compile(r"^/users/search$"), 5),
+  ("GET", re.compile(r"^/search/?$"), 3),
+  ("GET", re.compile(r"^/(songs|albums|artists)/?$"), 2),
+  ("GET", re.compile(r"^/(reviews|likes|playlists|follows)/(user|entity|followers|following)/"), 2),
+]
+
+def route_cost(method: str, path: str) -> int:
+  for route_method, pattern, cost in ROUTE_COSTS:
+    if method == route_method and pattern.match(path): return cost
+  return 1
+
+class TokenBucketLimiter:
+  """Per-key token buckets refilled continuously at `rate` tokens/s up to `burst`; least recently seen keys are evicted past `maxsize`"""
+  def __init__(self, burst: float, rate: float, maxsize: int):
+    self.burst, self.rate, self.maxsize = burst, rate, maxsize
+    self.limited = 0
+    self._buckets = OrderedDict()
+    self._lock = threading.Lock()
+
+  def take(self, key: str, cost: float) -> Tuple[bool, float]:
+    """Spend `cost` tokens from `key`'s bucket; returns (allowed, seconds until it would be allowed)"""
+    now, cost = time.monotonic(), min(cost, self.burst)
+    with self._lock:
+      tokens, updated = self._buckets.get(key, (self.burst, now))
+      tokens = min(self.burst, tokens + (now - updated) * self.rate)
+      allowed = tokens >= cost
+      if allowed: tokens -= cost
+      else: self.limited += 1
+      self._buckets[key] = (tokens, now)
+      self._buckets.move_to_end(key)
+      while len(self._buckets) > self.maxsize: self._buckets.popitem(last=False)
+    return allowed, 0.0 if allowed else (cost - tokens) / self.rate
+
+class LoadShedder:
+  """Admit requests while in-flight work and DB pool checkout waits stay under their limits.
+
+  Once requests are queueing for a connection with an average wait above `pool_wait_ms`, only cost-1 requests are
+  admitted; past `max_in_flight` concurrent requests nothing is. Both clear as soon as the backlog drains.
+  """
+  def __init__(self, max_in_flight: int, pool_wait_ms: float, stats):
+    self.max_in_flight, self.pool_wait_ms, self.stats = max_in_flight, pool_wait_ms, stats
+    self.in_flight = 0
+    self.shed = 0
+
+  def snapshot(self) -> dict:
+    return {"in_flight": self.in_flight, "shed": self.shed, "max_in_flight": self.max_in_flight}
+
+  def overloaded(self, cost: int) -> bool:
+    if self.in_flight >= self.max_in_flight: return True
+    return cost > 1 and self.stats.waiting > 0 and self.stats.wait_ms_ewma > self.pool_wait_ms
+
+def client_key(scope) -> str:
+  headers = dict(scope.get("headers") or [])
+  auth = headers.get(b"authorization", b"").decode("latin-1")
+  if auth[:7].lower() == "bearer ":
+    payload = verify_token(auth[7:].strip())
+    if payload and payload.get("type") == "access" and payload.get("sub"): return "user:" + payload["sub"]
+  forwarded = headers.get(b"x-forwarded-for", b"").decode("latin-1") if settings.RATE_LIMIT_TRUST_FORWARDED else ""
+  if forwarded: return "ip:" + forwarded.split(",")[0].strip()
+  client = scope.get("client")
+  return "ip:" + (client[0] if client else "unknown")
+
+rate_limiter = TokenBucketLimiter(settings.RATE_LIMIT_BURST, settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_MAX_CLIENTS)
+load_shedder = LoadShedder(settings.SHED_MAX_IN_FLIGHT, settings.SHED_POOL_WAIT_MS, InstrumentedAsyncQueuePool.stats)
+
+class LoadControlMiddleware:
+  """ASGI middleware that sheds load with 503 and rate-limits each client with 429 before a request reaches a route"""
+  def __init__(self, app, limiter: Optional[TokenBucketLimiter] = None, shedder: Optional[LoadShedder] = None):
+    self.app = app
+    self.limiter = limiter or rate_limiter
+    self.shedder = shedder or load_shedder
+
+  async def __call__(self, scope, receive, send):
+    if scope["type"] != "http" or scope["method"] == "OPTIONS": return await self.app(scope, receive, send)
+    cost = route_cost(scope["method"], scope["path"])
+    if not cost: return await self.app(scope, receive, send)
+    if self.shedder.overloaded(cost):
+      self.shedder.shed += 1
+      return await _reject(send, 503, "Service is overloaded, try again shortly", 1)
+    allowed, retry_after = self.limiter.take(client_key(scope), cost)
+    if not allowed: return await _reject(send, 429, "Too many requests", retry_after)
+    self.shedder.in_flight += 1
+    try:
+      await self.app(scope, receive, send)
+    finally:
+      self.shedder.in_flight -= 1
+
+async def _reject(send, status: int, detail: str, retry_after: float):
+  body = json.dumps({"detail": detail}).encode()
+  headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), (b"retry-after", str(max(1, math.ceil(retry_after))).encode())]
+  await send({"type": "http.response.start", "status": status, "headers": headers})
+  await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,43 @@
+import base64, binascii, json
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional
+from fastapi import HTTPException, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import DateTime, tuple_
+
+CURSOR_HEADER = "X-Next-Cursor"
+
+class Page(NamedTuple):
+  items: List[Any]
+  next_cursor: Optional[str] = None
+
+def encode_cursor(values: list) -> str:
+  raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values], separators=(",", ":"))
+  return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(token: str, keys: list) -> list:
+  try:
+    values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    if not isinstance(values, list) or len(values) != len(keys): raise ValueError(token)
+    return [datetime.fromisoformat(v) if v is not None and isinstance(k.type, DateTime) else v for k, v in zip(keys, values)]
+  except (ValueError, TypeError, binascii.Error):
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def paginate(query, keys: list, cursor: Optional[str] = None, skip: int = 0, limit: int = 50, descending: bool = False) -> Page:
+  """Keyset-paginate `query` on `keys` (sort key first, unique id last); falls back to offset paging without a cursor"""
+  query = query.order_by(*[k.desc() if descending else k.asc() for k in keys])
+  if cursor:
+    values = tuple_(*decode_cursor(cursor, keys))
+    query = query.filter(tuple_(*keys) < values if descending else tuple_(*keys) > values)
+  else: query = query.offset(skip)
+  items = query.limit(limit + 1).all()
+  if len(items) <= limit: return Page(items)
+  return Page(items[:limit], encode_cursor([getattr(items[limit - 1], k.key) for k in keys]))
+
+def with_cursor(response: Response, page: Page) -> list:
+  if page.next_cursor: response.headers[CURSOR_HEADER] = page.next_cursor
+  return page.items
+
+def page_response(page: Page) -> ORJSONResponse:
+  """Serialize a page of plain row dicts straight to JSON, skipping response_model validation"""
+  return ORJSONResponse(page.items, headers={CURSOR_HEADER: page.next_cursor} if page.next_cursor else None)
@@ -0,0 +1,70 @@
+import threading, time
+from bisect import bisect_left
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+class PoolStats:
+  """Checkout wait-time histogram and in-flight waiters for one pool class"""
+  BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self.waiting = 0
+    self.timeouts = 0
+    self.wait_ms_ewma = 0.0
+    self.histogram = [0] * (len(self.BUCKETS_MS) + 1)
+
+  def begin(self):
+    with self._lock: self.waiting += 1
+
+  def end(self, elapsed: float, timed_out: bool = False):
+    ms = elapsed * 1000
+    with self._lock:
+      self.waiting -= 1
+      self.timeouts += timed_out
+      self.histogram[bisect_left(self.BUCKETS_MS, ms)] += 1
+      self.wait_ms_ewma = 0.8 * self.wait_ms_ewma + 0.2 * ms
+
+  def snapshot(self, pool) -> dict:
+    labels = [f"<={b}ms" for b in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}ms"]
+    with self._lock:
+      return {
+        "size": pool.size(), "checked_out": pool.checkedout(), "checked_in": pool.checkedin(), "overflow": pool.overflow(),
+        "waiting": self.waiting, "timeouts": self.timeouts, "wait_ms_ewma": round(self.wait_ms_ewma, 3),
+        "wait_ms_histogram": dict(zip(labels, self.histogram))
+      }
+
+class _Instrumented:
+  stats: PoolStats
+
+  def _do_get(self):
+    start, timed_out = time.perf_counter(), False
+    self.stats.begin()
+    try:
+      return super()._do_get()
+    except exc.TimeoutError:
+      timed_out = True
+      raise
+    finally:
+      self.stats.end(time.perf_counter() - start, timed_out)
+
+class InstrumentedQueuePool(_Instrumented, QueuePool):
+  stats = PoolStats()
+
+class InstrumentedAsyncQueuePool(_Instrumented, AsyncAdaptedQueuePool):
+  stats = PoolStats()
+
+def ping_when_idle(engine, idle_seconds: float):
+  """Pre-ping only connections that sat in the pool longer than `idle_seconds`"""
+  @event.listens_for(engine, "checkin")
+  def _checkin(dbapi_connection, record):
+    record.info["checked_in_at"] = time.monotonic()
+
+  @event.listens_for(engine, "checkout")
+  def _checkout(dbapi_connection, record, proxy):
+    checked_in_at = record.info.get("checked_in_at")
+    if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds: return
+    try:
+      engine.dialect.do_ping(dbapi_connection)
+    except Exception:
+      raise exc.DisconnectionError()
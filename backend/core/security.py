@@ -1,6 +1,55 @@
+import asyncio, multiprocessing, threading
+from concurrent.futures import ProcessPoolExecutor
 from passlib.context import CryptContext
+from .config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+class HashingBusy(Exception):
+  """Raised when the hashing pool already has HASH_QUEUE_LIMIT jobs in flight"""
+
+_pool = None
+_inflight = 0
+_inflight_lock = threading.Lock()
 
 def hash_password(password: str) -> str: return pwd_context.hash(password)
-def verify_password(plain: str, hashed: str) -> bool: return pwd_context.verify(plain, hashed)
\ No newline at end of file
+def verify_password(plain: str, hashed: str) -> bool: return pwd_context.verify(plain, hashed)
+def needs_rehash(hashed: str) -> bool: return pwd_context.needs_update(hashed)
+
+def _get_pool():
+  global _pool
+  # spawn, not fork: forking a process that already runs the event loop and thread pools can deadlock the child
+  if _pool is None: _pool = ProcessPoolExecutor(max_workers=settings.HASH_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+  return _pool
+
+def _settled(future):
+  global _inflight
+  with _inflight_lock: _inflight -= 1
+
+async def _offload(fn, *args):
+  """Run fn in the hashing pool; a job counts against HASH_QUEUE_LIMIT until the pool finishes or drops it,
+  and one whose request was cancelled is withdrawn from the queue if no worker has picked it up yet"""
+  global _inflight
+  with _inflight_lock:
+    if _inflight >= settings.HASH_QUEUE_LIMIT: raise HashingBusy()
+    _inflight += 1
+  try:
+    future = _get_pool().submit(fn, *args)
+  except BaseException:
+    _settled(None)
+    raise
+  future.add_done_callback(_settled)
+  try:
+    return await asyncio.wrap_future(future)
+  except asyncio.CancelledError:
+    future.cancel()
+    raise
+
+async def hash_password_async(password: str) -> str: return await _offload(hash_password, password)
+async def verify_password_async(plain: str, hashed: str) -> bool: return await _offload(verify_password, plain, hashed)
+
+def shutdown_hash_pool():
+  global _pool
+  if _pool is not None:
+    _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
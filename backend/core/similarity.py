@@ -0,0 +1,41 @@
+import numpy as np
+from scipy import sparse
+
+def interning(keys):
+  """Map hashable keys to dense indices: (codes, distinct keys in first-seen order)"""
+  index = {}
+  codes = np.fromiter((index.setdefault(k, len(index)) for k in keys), dtype=np.int64)
+  return codes, list(index)
+
+def cosine_neighbors(rows, cols, weights, n_rows: int, n_cols: int, top_n: int, shrinkage: float = 0.0, block: int = 2048):
+  """Yield (row, neighbor rows, scores) for each row of the weighted rows x cols matrix, best first.
+
+  Scores are cosine similarity between row vectors, damped by co-occurrence count n as n / (n + shrinkage) so pairs
+  sharing a single column can't outrank well-supported ones. Works a block of rows at a time to bound memory.
+  """
+  weights = np.asarray(weights, dtype=np.float64)
+  keep = weights > 0
+  matrix = sparse.csr_matrix((weights[keep], (rows[keep], cols[keep])), shape=(n_rows, n_cols))
+  norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+  norms[norms == 0] = 1.0
+  unit = sparse.diags(1.0 / norms) @ matrix
+  unit_t, binary_t = unit.T.tocsr(), (matrix > 0).astype(np.float64).T.tocsr()
+  binary = binary_t.T.tocsr()
+  for start in range(0, n_rows, block):
+    chunk = np.arange(start, min(start + block, n_rows))
+    scores = (unit[chunk] @ unit_t).tocsr()
+    if shrinkage:
+      overlap = binary[chunk] @ binary_t
+      overlap.data = overlap.data / (overlap.data + shrinkage)
+      scores = scores.multiply(overlap).tocsr()
+    for offset, row in enumerate(chunk):
+      lo, hi = scores.indptr[offset], scores.indptr[offset + 1]
+      idx, data = scores.indices[lo:hi], scores.data[lo:hi]
+      own = idx != row
+      idx, data = idx[own], data[own]
+      if not len(idx): continue
+      if len(idx) > top_n:
+        best = np.argpartition(-data, top_n)[:top_n]
+        idx, data = idx[best], data[best]
+      order = np.lexsort((idx, -data))
+      yield int(row), idx[order], data[order]
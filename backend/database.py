@@ -1,14 +1,33 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from .core.config import settings
+from .core.pool import InstrumentedQueuePool, InstrumentedAsyncQueuePool, ping_when_idle
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+def _pool_options(poolclass):
+  return dict(
+    poolclass=poolclass, pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT, pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_PRE_PING == "always", pool_use_lifo=True
+  )
+
+engine = create_engine(settings.DATABASE_URL, **_pool_options(InstrumentedQueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine(settings.async_database_url, **_pool_options(InstrumentedAsyncQueuePool))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
+if settings.DB_PRE_PING == "idle":
+  ping_when_idle(engine, settings.DB_PRE_PING_IDLE_SECONDS)
+  ping_when_idle(async_engine.sync_engine, settings.DB_PRE_PING_IDLE_SECONDS)
+
 def get_db():
   db = SessionLocal()
   try:
     yield db
   finally:
-    db.close()
\ No newline at end of file
+    db.close()
+
+async def get_async_db():
+  async with AsyncSessionLocal() as db:
+    yield db
@@ -1,25 +1,68 @@
-from fastapi import FastAPI
+import asyncio, os
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from .database import engine, Base
+from .database import engine, async_engine, AsyncSessionLocal
+from .core.config import settings
+from .core.security import shutdown_hash_pool
+from .repo.counter_repo import flush_like_shards
+from .repo.trending_repo import flush_trending_shards
 from .firebase import init_firebase
+from .core.pagination import CURSOR_HEADER
+from .core.dependency import require_admin
+from .core.limits import LoadControlMiddleware, rate_limiter, load_shedder
 from .routes import auth_firebase, auth_local, auth_refresh
-from .routes import review, playlist, follow, likes, users, albums, songs, artists
+from .routes import review, playlist, follow, likes, users, albums, songs, artists, search, feed, trending, recommendations
+
+async def _flush_counters():
+  async with AsyncSessionLocal() as db:
+    await db.run_sync(flush_like_shards)
+    await db.run_sync(flush_trending_shards)
+
+async def flush_counters_periodically():
+  while True:
+    await asyncio.sleep(settings.COUNTER_FLUSH_SECONDS)
+    try: await _flush_counters()
+    except Exception as e: print(f"Warning: failed to flush counters: {e}")
+
+def migration_head() -> str:
+  return ScriptDirectory.from_config(Config(os.path.join(os.path.dirname(__file__), "alembic.ini"))).get_current_head()
+
+async def require_migrated_schema():
+  """Refuse to serve against a database that lags the models; missing columns would otherwise surface as query errors"""
+  async with async_engine.connect() as conn:
+    current = await conn.run_sync(lambda sync_conn: MigrationContext.configure(sync_conn).get_current_revision())
+  head = migration_head()
+  if current != head:
+    raise RuntimeError(f"Database schema is at revision {current}, expected {head}; run: alembic -c backend/alembic.ini upgrade head")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-  Base.metadata.create_all(bind=engine)
+  if settings.REQUIRE_MIGRATED_SCHEMA: await require_migrated_schema()
   init_firebase()
+  flusher = asyncio.create_task(flush_counters_periodically()) if settings.COUNTER_SHARDS > 1 else None
   yield
+  if flusher:
+    flusher.cancel()
+    await _flush_counters()
+  shutdown_hash_pool()
+  await async_engine.dispose()
 
 app = FastAPI(title="Acapella API", version="1.0.0", lifespan=lifespan)
 
+if settings.RATE_LIMIT_ENABLED:
+  app.add_middleware(LoadControlMiddleware)
+
 app.add_middleware(
   CORSMiddleware,
   allow_origins=["*"],
   allow_credentials=True,
   allow_methods=["*"],
   allow_headers=["*"],
+  expose_headers=[CURSOR_HEADER, "ETag"],
 )
 
 app.include_router(auth_firebase.router, tags=["Auth"])
@@ -33,6 +76,10 @@ app.include_router(review.router, tags=["Reviews"])
 app.include_router(likes.router, tags=["Likes"])
 app.include_router(users.router, tags=["Users"])
 app.include_router(follow.router, tags=["Follows"])
+app.include_router(search.router, tags=["Search"])
+app.include_router(feed.router, tags=["Feed"])
+app.include_router(trending.router, tags=["Trending"])
+app.include_router(recommendations.router, tags=["Recommendations"])
 
 @app.get("/")
 def root():
@@ -40,4 +87,12 @@ def root():
 
 @app.get("/health")
 def health():
-  return {"status": "healthy"}
\ No newline at end of file
+  return {"status": "healthy"}
+
+@app.get("/health/pool")
+def pool_health(admin = Depends(require_admin)):
+  return {
+    "sync": engine.pool.stats.snapshot(engine.pool),
+    "async": async_engine.pool.stats.snapshot(async_engine.pool),
+    "load": {**load_shedder.snapshot(), "rate_limited": rate_limiter.limited}
+  }
\ No newline at end of file
@@ -0,0 +1,21 @@
+from alembic import context
+from sqlalchemy import create_engine
+from backend.core.config import settings
+from backend.database import Base
+from backend import models
+
+target_metadata = Base.metadata
+
+def run_migrations_offline():
+  context.configure(url=settings.DATABASE_URL, target_metadata=target_metadata, literal_binds=True)
+  with context.begin_transaction():
+    context.run_migrations()
+
+def run_migrations_online():
+  with create_engine(settings.DATABASE_URL).connect() as connection:
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+      context.run_migrations()
+
+if context.is_offline_mode(): run_migrations_offline()
+else: run_migrations_online()
@@ -0,0 +1,156 @@
+"""baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB, ARRAY
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+  op.create_table("users",
+    sa.Column("id", sa.String, primary_key=True),
+    sa.Column("email", sa.String, unique=True),
+    sa.Column("password_hash", sa.String),
+    sa.Column("role", sa.String, nullable=False),
+    sa.Column("created_at", sa.DateTime(timezone=True)),
+    if_not_exists=True
+  )
+  op.create_table("user_profiles",
+    sa.Column("user_id", sa.String, sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    sa.Column("username", sa.String, unique=True, nullable=False),
+    sa.Column("display_name", sa.String),
+    sa.Column("photo_url", sa.String),
+    sa.Column("is_curator", sa.Boolean),
+    sa.Column("bio", sa.Text),
+    sa.Column("profile_complete", sa.Boolean),
+    sa.Column("linked_accounts", JSONB),
+    sa.Column("socials", JSONB),
+    sa.Column("followers_count", sa.Integer),
+    sa.Column("following_count", sa.Integer),
+    sa.Column("favorite_song_ids", ARRAY(sa.String)),
+    sa.Column("favorite_album_ids", ARRAY(sa.String)),
+    if_not_exists=True
+  )
+  op.create_table("follows",
+    sa.Column("follower_id", sa.String, sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    sa.Column("following_id", sa.String, sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    sa.Column("created_at", sa.DateTime),
+    if_not_exists=True
+  )
+  op.create_table("admin_applications",
+    sa.Column("id", sa.String, primary_key=True),
+    sa.Column("user_id", sa.String, sa.ForeignKey("users.id", ondelete="CASCADE")),
+    sa.Column("user_email", sa.String),
+    sa.Column("user_name", sa.String),
+    sa.Column("reason", sa.Text),
+    sa.Column("status", sa.String),
+    sa.Column("submitted_at", sa.DateTime),
+    if_not_exists=True
+  )
+  op.create_table("artists",
+    sa.Column("id", sa.String, primary_key=True),
+    sa.Column("name", sa.String, nullable=False),
+    sa.Column("name_lowercase", sa.String),
+    sa.Column("image_url", sa.String),
+    sa.Column("cover_image_url", sa.String),
+    sa.Column("genres", ARRAY(sa.String)),
+    sa.Column("bio", sa.Text),
+    sa.Column("socials", JSONB),
+    sa.Column("platform_links", JSONB),
+    if_not_exists=True
+  )
+  op.create_table("albums",
+    sa.Column("id", sa.String, primary_key=True),
+    sa.Column("title", sa.String, nullable=False),
+    sa.Column("title_lowercase", sa.String),
+    sa.Column("release_date", sa.String),
+    sa.Column("cover_art_url", sa.String),
+    sa.Column("genre", sa.String),
+    sa.Column("associated_film", sa.String),
+    sa.Column("platform_links", JSONB),
+    sa.Column("review_count", sa.Integer),
+    sa.Column("likes_count", sa.Integer),
+    sa.Column("tracklist", ARRAY(sa.String)),
+    if_not_exists=True
+  )
+  op.create_table("songs",
+    sa.Column("id", sa.String, primary_key=True),
+    sa.Column("title", sa.String, nullable=False),
+    sa.Column("title_lowercase", sa.String),
+    sa.Column("album_id", sa.String, sa.ForeignKey("albums.id", ondelete="SET NULL")),
+    sa.Column("duration", sa.Integer, nullable=False),
+    sa.Column("release_date", sa.String),
+    sa.Column("genre", sa.String),
+    sa.Column("credits", JSONB),
+    sa.Column("cover_art_url", sa.String),
+    sa.Column("platform_links", JSONB),
+    sa.Column("review_count", sa.Integer),
+    sa.Column("likes_count", sa.Integer),
+    if_not_exists=True
+  )
+  op.create_table("song_artists",
+    sa.Column("song_id", sa.String, sa.ForeignKey("songs.id", ondelete="CASCADE"), primary_key=True),
+    sa.Column("artist_id", sa.String, sa.ForeignKey("artists.id", ondelete="CASCADE"), primary_key=True),
+    if_not_exists=True
+  )
+  op.create_table("album_artists",
+    sa.Column("album_id", sa.String, sa.ForeignKey("albums.id", ondelete="CASCADE"), primary_key=True),
+    sa.Column("artist_id", sa.String, sa.ForeignKey("artists.id", ondelete="CASCADE"), primary_key=True),
+    if_not_exists=True
+  )
+  op.create_table("playlists",
+    sa.Column("id", sa.String, primary_key=True),
+    sa.Column("user_id", sa.String, sa.ForeignKey("users.id", ondelete="CASCADE")),
+    sa.Column("title", sa.String, nullable=False),
+    sa.Column("description", sa.Text),
+    sa.Column("cover_art_url", sa.String),
+    sa.Column("created_at", sa.DateTime),
+    sa.Column("updated_at", sa.DateTime),
+    sa.Column("is_public", sa.Boolean),
+    sa.Column("platform_links", JSONB),
+    if_not_exists=True
+  )
+  op.create_table("playlist_songs",
+    sa.Column("playlist_id", sa.String, sa.ForeignKey("playlists.id", ondelete="CASCADE"), primary_key=True),
+    sa.Column("song_id", sa.String, sa.ForeignKey("songs.id", ondelete="CASCADE"), primary_key=True),
+    if_not_exists=True
+  )
+  op.create_table("reviews",
+    sa.Column("id", sa.String, primary_key=True),
+    sa.Column("user_id", sa.String, sa.ForeignKey("users.id", ondelete="CASCADE")),
+    sa.Column("rating", sa.Integer, nullable=False),
+    sa.Column("review_text", sa.Text),
+    sa.Column("created_at", sa.DateTime),
+    sa.Column("likes_count", sa.Integer),
+    sa.Column("entity_id", sa.String, nullable=False),
+    sa.Column("entity_type", sa.String, nullable=False),
+    sa.Column("entity_title", sa.String),
+    sa.Column("entity_cover_art_url", sa.String),
+    sa.Column("entity_username", sa.String),
+    sa.Column("song_id", sa.String, sa.ForeignKey("songs.id", ondelete="CASCADE")),
+    if_not_exists=True
+  )
+  op.create_table("likes",
+    sa.Column("id", sa.String, primary_key=True),
+    sa.Column("user_id", sa.String, sa.ForeignKey("users.id", ondelete="CASCADE")),
+    sa.Column("entity_id", sa.String, nullable=False),
+    sa.Column("entity_type", sa.String, nullable=False),
+    sa.Column("created_at", sa.DateTime),
+    sa.Column("entity_title", sa.String),
+    sa.Column("entity_cover_art_url", sa.String),
+    sa.Column("review_on_entity_type", sa.String),
+    sa.Column("review_on_entity_id", sa.String),
+    sa.Column("review_on_entity_title", sa.String),
+    if_not_exists=True
+  )
+
+def downgrade():
+  for table in ["likes", "reviews", "playlist_songs", "playlists", "album_artists", "song_artists", "songs", "albums", "artists", "admin_applications", "follows", "user_profiles", "users"]:
+    op.drop_table(table)
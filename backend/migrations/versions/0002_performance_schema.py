@@ -0,0 +1,57 @@
+"""version counters, playlist positions, feed, trending and counter shard tables
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+VERSIONED = ["artists", "albums", "songs", "users", "user_profiles"]
+
+def upgrade():
+  op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+  for table in VERSIONED:
+    op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1")
+  op.execute("ALTER TABLE playlist_songs ADD COLUMN IF NOT EXISTS position BIGINT NOT NULL DEFAULT 0")
+  op.execute("""
+    UPDATE playlist_songs SET position = ranked.position FROM (
+      SELECT playlist_id, song_id, row_number() OVER (PARTITION BY playlist_id ORDER BY song_id) * 1024 AS position FROM playlist_songs
+      WHERE playlist_id IN (SELECT playlist_id FROM playlist_songs GROUP BY playlist_id HAVING max(position) = 0)
+    ) ranked
+    WHERE playlist_songs.playlist_id = ranked.playlist_id AND playlist_songs.song_id = ranked.song_id
+  """)
+  op.create_table("feed_items",
+    sa.Column("user_id", sa.String, sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    sa.Column("activity_type", sa.String, primary_key=True),
+    sa.Column("activity_id", sa.String, primary_key=True),
+    sa.Column("actor_id", sa.String, sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    sa.Column("created_at", sa.DateTime, nullable=False),
+    if_not_exists=True
+  )
+  op.create_table("trending_scores",
+    sa.Column("entity_type", sa.String, primary_key=True),
+    sa.Column("entity_id", sa.String, primary_key=True),
+    sa.Column("score", sa.Float, nullable=False),
+    sa.Column("updated_at", sa.DateTime(timezone=True)),
+    if_not_exists=True
+  )
+  op.create_table("like_counter_shards",
+    sa.Column("entity_type", sa.String, primary_key=True),
+    sa.Column("entity_id", sa.String, primary_key=True),
+    sa.Column("shard", sa.Integer, primary_key=True),
+    sa.Column("delta", sa.Integer, nullable=False),
+    if_not_exists=True
+  )
+
+def downgrade():
+  for table in ["like_counter_shards", "trending_scores", "feed_items"]:
+    op.drop_table(table)
+  op.drop_column("playlist_songs", "position")
+  for table in VERSIONED:
+    op.drop_column(table, "version")
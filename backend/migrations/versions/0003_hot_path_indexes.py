@@ -0,0 +1,48 @@
+"""hot-path indexes, built concurrently
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+  "ix_artists_name_trgm": "artists USING gin (name_lowercase gin_trgm_ops)",
+  "ix_artists_name_lowercase_id": "artists (name_lowercase, id)",
+  "ix_albums_title_trgm": "albums USING gin (title_lowercase gin_trgm_ops)",
+  "ix_albums_title_lowercase_id": "albums (title_lowercase, id)",
+  "ix_songs_title_trgm": "songs USING gin (title_lowercase gin_trgm_ops)",
+  "ix_songs_title_lowercase_id": "songs (title_lowercase, id)",
+  "ix_songs_album_id": "songs (album_id)",
+  "ix_song_artists_artist": "song_artists (artist_id, song_id)",
+  "ix_album_artists_artist": "album_artists (artist_id, album_id)",
+  "ix_playlists_user_created": "playlists (user_id, created_at, id)",
+  "ix_playlist_songs_position": "playlist_songs (playlist_id, position)",
+  "ix_reviews_user_created": "reviews (user_id, created_at, id)",
+  "ix_reviews_entity_created": "reviews (entity_type, entity_id, created_at, id)",
+  "ix_likes_user_created": "likes (user_id, created_at, id)",
+  "ix_likes_user_entity": "likes (user_id, entity_type, entity_id)",
+  "ix_follows_following_created": "follows (following_id, created_at, follower_id)",
+  "ix_follows_follower_created": "follows (follower_id, created_at, following_id)",
+  "ix_user_profiles_username_trgm": "user_profiles USING gin (lower(username) gin_trgm_ops)",
+  "ix_user_profiles_display_name_trgm": "user_profiles USING gin (lower(display_name) gin_trgm_ops)",
+  "ix_feed_items_user_created": "feed_items (user_id, created_at, activity_id)",
+  "ix_feed_items_activity": "feed_items (activity_type, activity_id)",
+  "ix_feed_items_user_actor": "feed_items (user_id, actor_id)",
+  "ix_trending_scores_type_score": "trending_scores (entity_type, score)",
+}
+
+def upgrade():
+  with op.get_context().autocommit_block():
+    for name, target in INDEXES.items():
+      op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}")
+
+def downgrade():
+  with op.get_context().autocommit_block():
+    for name in INDEXES:
+      op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
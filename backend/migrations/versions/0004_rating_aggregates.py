@@ -0,0 +1,34 @@
+"""denormalized rating sum and per-star histogram on songs and albums
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+RATED = ["songs", "albums"]
+COLUMNS = {"rating_sum": "BIGINT", **{f"rating_{star}": "INTEGER" for star in range(1, 6)}}
+
+def upgrade():
+  for table in RATED:
+    for column, kind in COLUMNS.items():
+      op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {kind} NOT NULL DEFAULT 0")
+    stars = ", ".join(f"rating_{star} = agg.rating_{star}" for star in range(1, 6))
+    counts = ", ".join(f"count(*) FILTER (WHERE rating = {star}) AS rating_{star}" for star in range(1, 6))
+    op.execute(f"""
+      UPDATE {table} SET review_count = agg.review_count, rating_sum = agg.rating_sum, {stars} FROM (
+        SELECT entity_id, count(*) AS review_count, sum(rating) AS rating_sum, {counts} FROM reviews
+        WHERE entity_type = '{table[:-1]}' GROUP BY entity_id
+      ) agg
+      WHERE {table}.id = agg.entity_id
+    """)
+
+def downgrade():
+  for table in RATED:
+    for column in COLUMNS:
+      op.drop_column(table, column)
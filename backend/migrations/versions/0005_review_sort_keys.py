@@ -0,0 +1,40 @@
+"""review sort keys: non-null likes_count, generated helpful_score and their entity indexes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+HELPFUL_PRIOR = 5
+HELPFUL_SCORE_SQL = f"""
+  CASE WHEN coalesce(btrim(review_text), '') = '' THEN 0 ELSE 1 END + (
+    likes_count::float8 / (likes_count + {HELPFUL_PRIOR}) + 1.9208 / (likes_count + {HELPFUL_PRIOR})
+    - 1.96 * sqrt(likes_count::float8 * {HELPFUL_PRIOR} / (likes_count + {HELPFUL_PRIOR}) + 0.9604) / (likes_count + {HELPFUL_PRIOR})
+  ) / (1 + 3.8416 / (likes_count + {HELPFUL_PRIOR}))
+"""
+
+INDEXES = {
+  "ix_reviews_entity_likes": "reviews (entity_type, entity_id, likes_count, id)",
+  "ix_reviews_entity_helpful": "reviews (entity_type, entity_id, helpful_score, id)",
+}
+
+def upgrade():
+  op.execute("UPDATE reviews SET likes_count = 0 WHERE likes_count IS NULL")
+  op.execute("ALTER TABLE reviews ALTER COLUMN likes_count SET DEFAULT 0, ALTER COLUMN likes_count SET NOT NULL")
+  op.execute(f"ALTER TABLE reviews ADD COLUMN IF NOT EXISTS helpful_score DOUBLE PRECISION GENERATED ALWAYS AS ({HELPFUL_SCORE_SQL}) STORED")
+  with op.get_context().autocommit_block():
+    for name, target in INDEXES.items():
+      op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}")
+
+def downgrade():
+  with op.get_context().autocommit_block():
+    for name in INDEXES:
+      op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+  op.drop_column("reviews", "helpful_score")
+  op.execute("ALTER TABLE reviews ALTER COLUMN likes_count DROP NOT NULL, ALTER COLUMN likes_count DROP DEFAULT")
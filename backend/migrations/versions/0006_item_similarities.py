@@ -0,0 +1,27 @@
+"""precomputed item-to-item similarities for recommendations
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+  op.create_table("item_similarities",
+    sa.Column("entity_type", sa.String, primary_key=True),
+    sa.Column("entity_id", sa.String, primary_key=True),
+    sa.Column("similar_ids", ARRAY(sa.String), nullable=False),
+    sa.Column("scores", ARRAY(sa.Float), nullable=False),
+    sa.Column("updated_at", sa.DateTime(timezone=True)),
+    if_not_exists=True
+  )
+
+def downgrade():
+  op.drop_table("item_similarities")
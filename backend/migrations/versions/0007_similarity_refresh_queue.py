@@ -0,0 +1,24 @@
+"""queue of entities whose precomputed similarities need refreshing
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+  op.create_table("similarity_refresh_queue",
+    sa.Column("entity_type", sa.String, primary_key=True),
+    sa.Column("entity_id", sa.String, primary_key=True),
+    sa.Column("queued_at", sa.DateTime(timezone=True)),
+    if_not_exists=True
+  )
+
+def downgrade():
+  op.drop_table("similarity_refresh_queue")
@@ -0,0 +1,31 @@
+"""store every remaining naive timestamp as timestamptz
+
+asyncpg binds the aware UTC datetimes the models write as timestamptz and rejects them for TIMESTAMP WITHOUT TIME
+ZONE columns. Existing values were written as UTC, so the session runs in UTC and Postgres reinterprets them in
+place without rewriting the tables.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+  ("playlists", "created_at"), ("playlists", "updated_at"), ("reviews", "created_at"), ("likes", "created_at"),
+  ("follows", "created_at"), ("admin_applications", "submitted_at"), ("feed_items", "created_at"),
+]
+
+def upgrade():
+  op.execute("SET LOCAL TIME ZONE 'UTC'")
+  for table, column in COLUMNS:
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE TIMESTAMP WITH TIME ZONE")
+
+def downgrade():
+  op.execute("SET LOCAL TIME ZONE 'UTC'")
+  for table, column in COLUMNS:
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE TIMESTAMP WITHOUT TIME ZONE")
@@ -0,0 +1,32 @@
+"""backfill and forbid NULLs in keyset pagination sort keys
+
+A NULL sort key sorts outside the keyset comparison, so (key, id) > (NULL, id) is NULL and paging stops at the
+first such row.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+LOWERCASED = {"artists": ("name_lowercase", "name"), "albums": ("title_lowercase", "title"), "songs": ("title_lowercase", "title")}
+CREATED = ["playlists", "reviews", "likes", "follows"]
+
+def upgrade():
+  for table, (column, source) in LOWERCASED.items():
+    op.execute(f"UPDATE {table} SET {column} = lower({source}) WHERE {column} IS NULL")
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+  for table in CREATED:
+    op.execute(f"UPDATE {table} SET created_at = to_timestamp(0) WHERE created_at IS NULL")
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL")
+
+def downgrade():
+  for table in CREATED:
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN created_at DROP NOT NULL")
+  for table, (column, _) in LOWERCASED.items():
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} DROP NOT NULL")
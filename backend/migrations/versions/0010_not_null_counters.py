@@ -0,0 +1,25 @@
+"""default engagement counters to 0 and forbid NULLs
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+COUNTERS = {"songs": ["review_count", "likes_count"], "albums": ["review_count", "likes_count"]}
+
+def upgrade():
+  for table, columns in COUNTERS.items():
+    for column in columns:
+      op.execute(f"UPDATE {table} SET {column} = 0 WHERE {column} IS NULL")
+      op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT 0, ALTER COLUMN {column} SET NOT NULL")
+
+def downgrade():
+  for table, columns in COUNTERS.items():
+    for column in columns:
+      op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} DROP NOT NULL, ALTER COLUMN {column} DROP DEFAULT")
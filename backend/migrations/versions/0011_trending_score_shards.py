@@ -0,0 +1,26 @@
+"""write-behind shards for trending score increments
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+  op.create_table("trending_score_shards",
+    sa.Column("entity_type", sa.String, primary_key=True),
+    sa.Column("entity_id", sa.String, primary_key=True),
+    sa.Column("shard", sa.Integer, primary_key=True),
+    sa.Column("score", sa.Float, nullable=False),
+    sa.Column("updated_at", sa.DateTime(timezone=True)),
+    if_not_exists=True
+  )
+
+def downgrade():
+  op.drop_table("trending_score_shards")
@@ -0,0 +1,22 @@
+"""record each actor's feed delivery mode at write time
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from backend.core.config import settings
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+  op.add_column("user_profiles", sa.Column("feed_pulled", sa.Boolean, nullable=False, server_default=sa.false()))
+  # actors pulled under the follower-count rule so far keep being pulled
+  op.execute(sa.text("UPDATE user_profiles SET feed_pulled = true WHERE followers_count > :threshold").bindparams(threshold=settings.FEED_FANOUT_MAX_FOLLOWERS))
+
+def downgrade():
+  op.drop_column("user_profiles", "feed_pulled")
@@ -1,2 +1,2 @@
 from .user import User, UserProfile, Follow, AdminApplication
-from .feature import Artist, Album, Song, Playlist, Review, Like
\ No newline at end of file
+from .feature import Artist, Album, Song, Playlist, Review, Like, FeedItem, TrendingScore, TrendingScoreShard, ItemSimilarity, SimilarityRefresh, LikeCounterShard
\ No newline at end of file
@@ -1,64 +1,103 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Table, Text
+from sqlalchemy import literal_column, Computed, Column, String, Integer, BigInteger, Boolean, DateTime, ForeignKey, Table, Text, Index, Float
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB, ARRAY
 from datetime import datetime, timezone
 from ..database import Base
 
+def _lowered(source: str):
+  return lambda context: (context.get_current_parameters().get(source) or "").lower()
+
 playlist_songs = Table("playlist_songs", Base.metadata,
   Column("playlist_id", String, ForeignKey("playlists.id", ondelete="CASCADE"), primary_key=True),
-  Column("song_id", String, ForeignKey("songs.id", ondelete="CASCADE"), primary_key=True)
+  Column("song_id", String, ForeignKey("songs.id", ondelete="CASCADE"), primary_key=True),
+  Column("position", BigInteger, nullable=False, server_default="0"),
+  Index("ix_playlist_songs_position", "playlist_id", "position")
 )
 
 song_artists = Table("song_artists", Base.metadata,
   Column("song_id", String, ForeignKey("songs.id", ondelete="CASCADE"), primary_key=True),
-  Column("artist_id", String, ForeignKey("artists.id", ondelete="CASCADE"), primary_key=True)
+  Column("artist_id", String, ForeignKey("artists.id", ondelete="CASCADE"), primary_key=True),
+  Index("ix_song_artists_artist", "artist_id", "song_id")
 )
 
 album_artists = Table("album_artists", Base.metadata,
   Column("album_id", String, ForeignKey("albums.id", ondelete="CASCADE"), primary_key=True),
-  Column("artist_id", String, ForeignKey("artists.id", ondelete="CASCADE"), primary_key=True)
+  Column("artist_id", String, ForeignKey("artists.id", ondelete="CASCADE"), primary_key=True),
+  Index("ix_album_artists_artist", "artist_id", "album_id")
 )
 
 class Artist(Base):
   __tablename__ = "artists"
+  __table_args__ = (
+    Index("ix_artists_name_trgm", "name_lowercase", postgresql_using="gin", postgresql_ops={"name_lowercase": "gin_trgm_ops"}),
+    Index("ix_artists_name_lowercase_id", "name_lowercase", "id"),
+  )
 
   id = Column(String, primary_key=True)
   name = Column(String, nullable=False)
-  name_lowercase = Column(String)
+  name_lowercase = Column(String, nullable=False, default=_lowered("name"))
   image_url = Column(String)
   cover_image_url = Column(String)
   genres = Column(ARRAY(String))
   bio = Column(Text)
   socials = Column(JSONB)
   platform_links = Column(JSONB)
+  version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version + 1"))
 
   songs = relationship("Song", secondary=song_artists, back_populates="artists")
   albums = relationship("Album", secondary=album_artists, back_populates="artists")
 
-class Album(Base):
+class RatingAggregate:
+  rating_sum = Column(BigInteger, nullable=False, default=0, server_default="0")
+  rating_1 = Column(Integer, nullable=False, default=0, server_default="0")
+  rating_2 = Column(Integer, nullable=False, default=0, server_default="0")
+  rating_3 = Column(Integer, nullable=False, default=0, server_default="0")
+  rating_4 = Column(Integer, nullable=False, default=0, server_default="0")
+  rating_5 = Column(Integer, nullable=False, default=0, server_default="0")
+
+  @property
+  def rating_histogram(self):
+    return [self.rating_1 or 0, self.rating_2 or 0, self.rating_3 or 0, self.rating_4 or 0, self.rating_5 or 0]
+
+  @property
+  def average_rating(self):
+    total = sum(self.rating_histogram)
+    return round((self.rating_sum or 0) / total, 2) if total else None
+
+class Album(RatingAggregate, Base):
   __tablename__ = "albums"
+  __table_args__ = (
+    Index("ix_albums_title_trgm", "title_lowercase", postgresql_using="gin", postgresql_ops={"title_lowercase": "gin_trgm_ops"}),
+    Index("ix_albums_title_lowercase_id", "title_lowercase", "id"),
+  )
 
   id = Column(String, primary_key=True)
   title = Column(String, nullable=False)
-  title_lowercase = Column(String)
+  title_lowercase = Column(String, nullable=False, default=_lowered("title"))
   release_date = Column(String)
   cover_art_url = Column(String)
   genre = Column(String)
   associated_film = Column(String)
   platform_links = Column(JSONB)
-  review_count = Column(Integer, default=0)
-  likes_count = Column(Integer, default=0)
+  review_count = Column(Integer, nullable=False, default=0, server_default="0")
+  likes_count = Column(Integer, nullable=False, default=0, server_default="0")
   tracklist = Column(ARRAY(String))
+  version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version + 1"))
 
   artists = relationship("Artist", secondary=album_artists, back_populates="albums")
   songs = relationship("Song", back_populates="album")
 
-class Song(Base):
+class Song(RatingAggregate, Base):
   __tablename__ = "songs"
+  __table_args__ = (
+    Index("ix_songs_title_trgm", "title_lowercase", postgresql_using="gin", postgresql_ops={"title_lowercase": "gin_trgm_ops"}),
+    Index("ix_songs_title_lowercase_id", "title_lowercase", "id"),
+    Index("ix_songs_album_id", "album_id"),
+  )
 
   id = Column(String, primary_key=True)
   title = Column(String, nullable=False)
-  title_lowercase = Column(String)
+  title_lowercase = Column(String, nullable=False, default=_lowered("title"))
   album_id = Column(String, ForeignKey("albums.id", ondelete="SET NULL"))
   duration = Column(Integer, nullable=False)
   release_date = Column(String)
@@ -66,8 +105,9 @@ class Song(Base):
   credits = Column(JSONB)
   cover_art_url = Column(String)
   platform_links = Column(JSONB)
-  review_count = Column(Integer, default=0)
-  likes_count = Column(Integer, default=0)
+  review_count = Column(Integer, nullable=False, default=0, server_default="0")
+  likes_count = Column(Integer, nullable=False, default=0, server_default="0")
+  version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version + 1"))
 
   album = relationship("Album", back_populates="songs")
   artists = relationship("Artist", secondary=song_artists, back_populates="songs")
@@ -75,29 +115,47 @@ class Song(Base):
 
 class Playlist(Base):
   __tablename__ = "playlists"
+  __table_args__ = (Index("ix_playlists_user_created", "user_id", "created_at", "id"),)
 
   id = Column(String, primary_key=True)
   user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
   title = Column(String, nullable=False)
   description = Column(Text)
   cover_art_url = Column(String)
-  created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
-  updated_at = Column(DateTime)
+  created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+  updated_at = Column(DateTime(timezone=True))
   is_public = Column(Boolean, default=True)
   platform_links = Column(JSONB)
 
   user = relationship("User", back_populates="playlists")
-  songs = relationship("Song", secondary=playlist_songs)
+  songs = relationship("Song", secondary=playlist_songs, order_by=playlist_songs.c.position, viewonly=True)
+
+# Written reviews rank above bare ratings; within each group, the Wilson lower bound of likes_count
+# against HELPFUL_PRIOR pseudo-views (z = 1.96) so a couple of early likes can't outrank a well-liked review
+HELPFUL_PRIOR = 5
+HELPFUL_SCORE_SQL = f"""
+  CASE WHEN coalesce(btrim(review_text), '') = '' THEN 0 ELSE 1 END + (
+    likes_count::float8 / (likes_count + {HELPFUL_PRIOR}) + 1.9208 / (likes_count + {HELPFUL_PRIOR})
+    - 1.96 * sqrt(likes_count::float8 * {HELPFUL_PRIOR} / (likes_count + {HELPFUL_PRIOR}) + 0.9604) / (likes_count + {HELPFUL_PRIOR})
+  ) / (1 + 3.8416 / (likes_count + {HELPFUL_PRIOR}))
+"""
 
 class Review(Base):
   __tablename__ = "reviews"
+  __table_args__ = (
+    Index("ix_reviews_user_created", "user_id", "created_at", "id"),
+    Index("ix_reviews_entity_created", "entity_type", "entity_id", "created_at", "id"),
+    Index("ix_reviews_entity_likes", "entity_type", "entity_id", "likes_count", "id"),
+    Index("ix_reviews_entity_helpful", "entity_type", "entity_id", "helpful_score", "id"),
+  )
 
   id = Column(String, primary_key=True)
   user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
   rating = Column(Integer, nullable=False)
   review_text = Column(Text)
-  created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
-  likes_count = Column(Integer, default=0)
+  created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+  likes_count = Column(Integer, nullable=False, default=0, server_default="0")
+  helpful_score = Column(Float, Computed(HELPFUL_SCORE_SQL, persisted=True))
   entity_id = Column(String, nullable=False)
   entity_type = Column(String, nullable=False)
   entity_title = Column(String)
@@ -110,16 +168,76 @@ class Review(Base):
 
 class Like(Base):
   __tablename__ = "likes"
+  __table_args__ = (
+    Index("ix_likes_user_created", "user_id", "created_at", "id"),
+    Index("ix_likes_user_entity", "user_id", "entity_type", "entity_id"),
+  )
 
   id = Column(String, primary_key=True)
   user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
   entity_id = Column(String, nullable=False)
   entity_type = Column(String, nullable=False)
-  created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+  created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
   entity_title = Column(String)
   entity_cover_art_url = Column(String)
   review_on_entity_type = Column(String)
   review_on_entity_id = Column(String)
   review_on_entity_title = Column(String)
 
-  user = relationship("User", back_populates="likes")
\ No newline at end of file
+  user = relationship("User", back_populates="likes")
+
+class FeedItem(Base):
+  __tablename__ = "feed_items"
+  __table_args__ = (
+    Index("ix_feed_items_user_created", "user_id", "created_at", "activity_id"),
+    Index("ix_feed_items_activity", "activity_type", "activity_id"),
+    Index("ix_feed_items_user_actor", "user_id", "actor_id"),
+  )
+
+  user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+  activity_type = Column(String, primary_key=True)
+  activity_id = Column(String, primary_key=True)
+  actor_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+  created_at = Column(DateTime(timezone=True), nullable=False)
+
+class TrendingScore(Base):
+  __tablename__ = "trending_scores"
+  __table_args__ = (Index("ix_trending_scores_type_score", "entity_type", "score"),)
+
+  entity_type = Column(String, primary_key=True)
+  entity_id = Column(String, primary_key=True)
+  score = Column(Float, nullable=False)
+  updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+class TrendingScoreShard(Base):
+  __tablename__ = "trending_score_shards"
+
+  entity_type = Column(String, primary_key=True)
+  entity_id = Column(String, primary_key=True)
+  shard = Column(Integer, primary_key=True)
+  score = Column(Float, nullable=False)
+  updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+class ItemSimilarity(Base):
+  __tablename__ = "item_similarities"
+
+  entity_type = Column(String, primary_key=True)
+  entity_id = Column(String, primary_key=True)
+  similar_ids = Column(ARRAY(String), nullable=False)
+  scores = Column(ARRAY(Float), nullable=False)
+  updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+class SimilarityRefresh(Base):
+  __tablename__ = "similarity_refresh_queue"
+
+  entity_type = Column(String, primary_key=True)
+  entity_id = Column(String, primary_key=True)
+  queued_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+class LikeCounterShard(Base):
+  __tablename__ = "like_counter_shards"
+
+  entity_type = Column(String, primary_key=True)
+  entity_id = Column(String, primary_key=True)
+  shard = Column(Integer, primary_key=True)
+  delta = Column(Integer, nullable=False, default=0)
\ No newline at end of file
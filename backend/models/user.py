@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import literal_column, Column, String, Integer, Boolean, DateTime, ForeignKey, Text, Index, func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB, ARRAY
 from datetime import datetime, timezone
@@ -12,6 +12,7 @@ class User(Base):
   password_hash = Column(String)
   role = Column(String, nullable=False, default="user")
   created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+  version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version + 1"))
 
   profile = relationship("UserProfile", back_populates="user", uselist=False, cascade="all, delete-orphan")
   playlists = relationship("Playlist", back_populates="user", cascade="all, delete-orphan")
@@ -34,17 +35,26 @@ class UserProfile(Base):
   socials = Column(JSONB)
   followers_count = Column(Integer, default=0)
   following_count = Column(Integer, default=0)
+  feed_pulled = Column(Boolean, nullable=False, default=False, server_default="false")
   favorite_song_ids = Column(ARRAY(String))
   favorite_album_ids = Column(ARRAY(String))
+  version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version + 1"))
 
   user = relationship("User", back_populates="profile")
 
+Index("ix_user_profiles_username_trgm", func.lower(UserProfile.username).label("username_lower"), postgresql_using="gin", postgresql_ops={"username_lower": "gin_trgm_ops"})
+Index("ix_user_profiles_display_name_trgm", func.lower(UserProfile.display_name).label("display_name_lower"), postgresql_using="gin", postgresql_ops={"display_name_lower": "gin_trgm_ops"})
+
 class Follow(Base):
   __tablename__ = "follows"
+  __table_args__ = (
+    Index("ix_follows_following_created", "following_id", "created_at", "follower_id"),
+    Index("ix_follows_follower_created", "follower_id", "created_at", "following_id"),
+  )
 
   follower_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
   following_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
-  created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+  created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
 
   follower_user = relationship("User", foreign_keys=[follower_id], back_populates="following")
   following_user = relationship("User", foreign_keys=[following_id], back_populates="followers")
@@ -58,4 +68,4 @@ class AdminApplication(Base):
   user_name = Column(String)
   reason = Column(Text)
   status = Column(String, default="pending")
-  submitted_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
\ No newline at end of file
+  submitted_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
\ No newline at end of file
@@ -0,0 +1,97 @@
+from datetime import datetime, timezone
+from typing import Iterable, List
+import numpy as np
+from scipy import sparse
+from sqlalchemy import and_, delete, func, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.similarity import interning, cosine_neighbors
+from ..models import Artist, Like, ItemSimilarity, SimilarityRefresh
+from ..models.feature import song_artists, album_artists
+
+SIGNAL_WEIGHTS = {"collab": 0.5, "genre": 0.2, "likers": 0.3}
+
+def _collab_rows(db: Session):
+  songs = select(song_artists.c.artist_id, literal("song:") + song_artists.c.song_id)
+  albums = select(album_artists.c.artist_id, literal("album:") + album_artists.c.album_id)
+  return [(artist_id, work, 1.0) for artist_id, work in db.execute(union_all(songs, albums)).all()]
+
+def _genre_rows(db: Session):
+  genre = func.lower(func.unnest(Artist.genres))
+  rows = db.execute(select(Artist.id, genre).distinct()).all()
+  if not rows: return []
+  codes, genres = interning(g for _, g in rows)
+  df = np.bincount(codes, minlength=len(genres))
+  idf = np.log((1 + len({a for a, _ in rows})) / (1 + df)) + 1.0
+  return [(artist_id, g, float(idf[c])) for (artist_id, g), c in zip(rows, codes)]
+
+def _liker_rows(db: Session):
+  by_song = select(song_artists.c.artist_id, Like.user_id).join(Like, and_(Like.entity_type == "song", Like.entity_id == song_artists.c.song_id))
+  by_album = select(album_artists.c.artist_id, Like.user_id).join(Like, and_(Like.entity_type == "album", Like.entity_id == album_artists.c.album_id))
+  likes = union_all(by_song, by_album).subquery()
+  rows = db.execute(select(likes.c.artist_id, likes.c.user_id, func.count()).group_by(likes.c.artist_id, likes.c.user_id)).all()
+  return [(artist_id, user_id, float(np.log1p(n))) for artist_id, user_id, n in rows]
+
+def _profiles(db: Session):
+  """Each artist's collaborations, genres and likers as one sparse row: per-signal blocks unit-normalized and scaled
+  by sqrt(weight), so a dot product between two rows is the weighted sum of the per-signal cosines"""
+  signals = {"collab": _collab_rows(db), "genre": _genre_rows(db), "likers": _liker_rows(db)}
+  artist_codes, artist_ids = interning(a for rows in signals.values() for a, _, _ in rows)
+  blocks, start = [], 0
+  for name, rows in signals.items():
+    if not rows: continue
+    codes, features = interning(f for _, f, _ in rows)
+    block = sparse.csr_matrix((np.array([w for _, _, w in rows]), (artist_codes[start:start + len(rows)], codes)), shape=(len(artist_ids), len(features)))
+    norms = np.sqrt(np.asarray(block.multiply(block).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    blocks.append(sparse.diags(np.sqrt(SIGNAL_WEIGHTS[name]) / norms) @ block)
+    start += len(rows)
+  return (sparse.hstack(blocks).tocoo() if blocks else None), artist_ids
+
+def build_artist_similarities(db: Session) -> int:
+  """Recompute every artist's neighbors and swap them in within a single transaction.
+
+  A change to one artist's credits, genres or likers can move it into or out of any other artist's list, so there
+  is no cheaper correct partial update; run this from the batch script, never in the API process.
+  """
+  profiles, ids = _profiles(db)
+  db.execute(delete(ItemSimilarity).where(ItemSimilarity.entity_type == "artist"))
+  built, batch = 0, []
+  if profiles is not None:
+    now = datetime.now(timezone.utc)
+    neighbors = cosine_neighbors(profiles.row, profiles.col, profiles.data, *profiles.shape, settings.RECS_TOP_N, settings.RECS_SHRINKAGE, settings.RECS_BLOCK_ROWS)
+    for row, similar, scores in neighbors:
+      scores = np.round(scores, 6)
+      similar, scores = similar[scores > 0], scores[scores > 0]
+      if not len(similar): continue
+      batch.append({"entity_type": "artist", "entity_id": ids[row], "similar_ids": [ids[i] for i in similar], "scores": [float(s) for s in scores], "updated_at": now})
+      if len(batch) >= 1000:
+        db.execute(insert(ItemSimilarity), batch)
+        built, batch = built + len(batch), []
+    if batch: db.execute(insert(ItemSimilarity), batch)
+  db.commit()
+  return built + len(batch)
+
+def queue_refresh(db: Session, artist_ids: Iterable[str]):
+  rows = [{"entity_type": "artist", "entity_id": artist_id} for artist_id in set(artist_ids) if artist_id]
+  if rows: db.execute(insert(SimilarityRefresh).values(rows).on_conflict_do_nothing())
+
+def refresh_queued(db: Session) -> int:
+  """Rebuild only when link changes were queued since the last build; the queue drains in the rebuild's transaction"""
+  queued = db.scalars(delete(SimilarityRefresh).where(SimilarityRefresh.entity_type == "artist").returning(SimilarityRefresh.entity_id)).all()
+  if not queued:
+    db.rollback()
+    return 0
+  return build_artist_similarities(db)
+
+def get_similar_artists(db: Session, artist_id: str, limit: int = 20) -> List[Artist]:
+  row = db.execute(select(ItemSimilarity.similar_ids, ItemSimilarity.scores).where(
+    ItemSimilarity.entity_type == "artist", ItemSimilarity.entity_id == artist_id
+  )).first()
+  if not row: return []
+  scores = dict(zip(row.similar_ids[:limit], row.scores[:limit]))
+  found = {artist.id: artist for artist in db.query(Artist).filter(Artist.id.in_(list(scores))).all()}
+  artists = [found[i] for i in scores if i in found]
+  for artist in artists: artist.similarity = scores[artist.id]
+  return artists
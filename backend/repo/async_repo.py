@@ -0,0 +1,83 @@
+from functools import wraps
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import feature_repo, user_repo, feed_repo, search_repo, trending_repo, graph_repo, recommendation_repo, artist_similarity_repo
+
+def _async(fn):
+  """Expose a sync repo function as a coroutine running on an AsyncSession's greenlet"""
+  @wraps(fn)
+  async def run(db: AsyncSession, *args, **kwargs):
+    return await db.run_sync(fn, *args, **kwargs)
+  return run
+
+get_artist = _async(feature_repo.get_artist)
+get_artists = _async(feature_repo.get_artists)
+get_artists_by_ids = _async(feature_repo.get_artists_by_ids)
+search_artists = _async(feature_repo.search_artists)
+create_artist = _async(feature_repo.create_artist)
+update_artist = _async(feature_repo.update_artist)
+delete_artist = _async(feature_repo.delete_artist)
+get_album = _async(feature_repo.get_album)
+get_albums = _async(feature_repo.get_albums)
+get_albums_by_ids = _async(feature_repo.get_albums_by_ids)
+search_albums = _async(feature_repo.search_albums)
+create_album = _async(feature_repo.create_album)
+update_album = _async(feature_repo.update_album)
+delete_album = _async(feature_repo.delete_album)
+get_song = _async(feature_repo.get_song)
+get_songs = _async(feature_repo.get_songs)
+get_songs_by_ids = _async(feature_repo.get_songs_by_ids)
+search_songs = _async(feature_repo.search_songs)
+create_song = _async(feature_repo.create_song)
+update_song = _async(feature_repo.update_song)
+delete_song = _async(feature_repo.delete_song)
+get_playlist = _async(feature_repo.get_playlist)
+get_playlists_by_user = _async(feature_repo.get_playlists_by_user)
+create_playlist = _async(feature_repo.create_playlist)
+update_playlist = _async(feature_repo.update_playlist)
+delete_playlist = _async(feature_repo.delete_playlist)
+append_playlist_songs = _async(feature_repo.append_playlist_songs)
+remove_playlist_song = _async(feature_repo.remove_playlist_song)
+move_playlist_song = _async(feature_repo.move_playlist_song)
+get_review = _async(feature_repo.get_review)
+get_reviews_by_user = _async(feature_repo.get_reviews_by_user)
+get_reviews_by_entity = _async(feature_repo.get_reviews_by_entity)
+create_review = _async(feature_repo.create_review)
+update_review = _async(feature_repo.update_review)
+delete_review = _async(feature_repo.delete_review)
+get_like = _async(feature_repo.get_like)
+get_likes_by_user = _async(feature_repo.get_likes_by_user)
+get_like_by_id = _async(feature_repo.get_like_by_id)
+create_like = _async(feature_repo.create_like)
+delete_like = _async(feature_repo.delete_like)
+check_likes = _async(feature_repo.check_likes)
+
+get_user_by_id = _async(user_repo.get_user_by_id)
+get_user_version = _async(user_repo.get_user_version)
+get_user_by_email = _async(user_repo.get_user_by_email)
+get_user_by_username = _async(user_repo.get_user_by_username)
+search_users = _async(user_repo.search_users)
+get_user_profile = _async(user_repo.get_user_profile)
+create_user = _async(user_repo.create_user)
+create_user_with_password = _async(user_repo.create_user_with_password)
+update_user = _async(user_repo.update_user)
+update_user_profile = _async(user_repo.update_user_profile)
+delete_user = _async(user_repo.delete_user)
+get_follow = _async(user_repo.get_follow)
+follow_user = _async(user_repo.follow_user)
+unfollow_user = _async(user_repo.unfollow_user)
+get_followers = _async(user_repo.get_followers)
+get_following = _async(user_repo.get_following)
+
+get_relationship = graph_repo.get_relationship
+get_mutuals = graph_repo.get_mutuals
+get_suggestions = graph_repo.get_suggestions
+
+get_feed = _async(feed_repo.get_feed)
+
+search_all = _async(search_repo.search_all)
+
+get_trending = _async(trending_repo.get_trending)
+
+get_similar_items = _async(recommendation_repo.get_similar_items)
+get_recommendations = _async(recommendation_repo.get_recommendations)
+get_similar_artists = _async(artist_similarity_repo.get_similar_artists)
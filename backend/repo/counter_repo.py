@@ -0,0 +1,49 @@
+import random
+from collections import defaultdict
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models import Song, Album, Review, LikeCounterShard
+
+LIKE_TARGETS = {"song": Song, "album": Album, "review": Review}
+RATING_TARGETS = {"song": Song, "album": Album}
+
+def bump(db: Session, column, key_column, key: str, delta: int):
+  db.query(column.class_).filter(key_column == key).update(
+    {column: func.greatest(func.coalesce(column, 0) + delta, 0)}, synchronize_session=False
+  )
+
+def bump_rating(db: Session, entity_type: str, entity_id: str, ratings: dict):
+  """Apply {star: delta} to an entity's review count, rating sum and histogram in one UPDATE"""
+  model = RATING_TARGETS.get(entity_type)
+  ratings = {star: delta for star, delta in ratings.items() if delta and 1 <= star <= 5}
+  if not model or not ratings: return
+  values = {model.rating_sum: model.rating_sum + sum(star * delta for star, delta in ratings.items())}
+  for star, delta in ratings.items():
+    column = getattr(model, f"rating_{star}")
+    values[column] = func.greatest(column + delta, 0)
+  count = sum(ratings.values())
+  if count: values[model.review_count] = func.greatest(func.coalesce(model.review_count, 0) + count, 0)
+  db.query(model).filter(model.id == entity_id).update(values, synchronize_session=False)
+
+def bump_likes(db: Session, entity_type: str, entity_id: str, delta: int):
+  model = LIKE_TARGETS.get(entity_type)
+  if not model: return
+  if settings.COUNTER_SHARDS <= 1:
+    return bump(db, model.likes_count, model.id, entity_id, delta)
+  stmt = insert(LikeCounterShard).values(entity_type=entity_type, entity_id=entity_id, shard=random.randrange(settings.COUNTER_SHARDS), delta=delta)
+  db.execute(stmt.on_conflict_do_update(
+    index_elements=[LikeCounterShard.entity_type, LikeCounterShard.entity_id, LikeCounterShard.shard],
+    set_={"delta": LikeCounterShard.delta + stmt.excluded.delta}
+  ))
+
+def flush_like_shards(db: Session):
+  rows = db.execute(delete(LikeCounterShard).returning(LikeCounterShard.entity_type, LikeCounterShard.entity_id, LikeCounterShard.delta)).all()
+  totals = defaultdict(int)
+  for entity_type, entity_id, delta in rows: totals[(entity_type, entity_id)] += delta
+  for (entity_type, entity_id), delta in totals.items():
+    model = LIKE_TARGETS.get(entity_type)
+    if model and delta: bump(db, model.likes_count, model.id, entity_id, delta)
+  db.commit()
+  return len(totals)
@@ -1,16 +1,69 @@
-from sqlalchemy.orm import Session, joinedload
+from datetime import datetime, timezone
+from sqlalchemy import String, delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert, array_agg, aggregate_order_by
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session, joinedload, selectinload
 from ..models import Artist, Album, Song, Playlist, Review, Like
-from typing import List
+from ..models.feature import song_artists, album_artists, playlist_songs
+from .. import schema
+from typing import List, Optional, Tuple
+from ..core.pagination import paginate
+from ..core.config import settings
+from ..core.cache import LikedSet, liked_set_cache
+from .search_repo import search_match, search_rank
+from .counter_repo import bump_rating, bump_likes
+from . import feed_repo, trending_repo, artist_similarity_repo
 
-def get_artist(db: Session, artist_id: str):
-  return db.query(Artist).filter(Artist.id == artist_id).first()
+def _search(db: Session, model, column, term: str, skip: int, limit: int, *options):
+  term = term.strip().lower()
+  return db.query(model).options(*options).filter(search_match(column, term)).order_by(search_rank(column, term).desc(), model.id).offset(skip).limit(limit).all()
 
-def get_artists(db: Session, skip: int = 0, limit: int = 50):
-  return db.query(Artist).offset(skip).limit(limit).all()
+def _projection(model, response_schema, **computed):
+  """One labeled column per response field, in field order; NULLs take the field's scalar default as validation would"""
+  columns = []
+  for name, field in response_schema.model_fields.items():
+    column = computed[name] if name in computed else getattr(model, name)
+    if isinstance(field.default, (bool, int, float, str)): column = func.coalesce(column, field.default)
+    columns.append(column.label(name))
+  return columns
+
+def _artist_ids(link, key_column, model):
+  return func.array(select(link.c.artist_id).where(key_column == model.id).order_by(link.c.artist_id).scalar_subquery(), type_=ARRAY(String))
+
+def _rows(page):
+  return page._replace(items=[row._asdict() for row in page.items])
+
+def _in_order(query, model, ids: List[str]):
+  ids = list(dict.fromkeys(ids))
+  found = {obj.id: obj for obj in query.filter(model.id.in_(ids)).all()} if ids else {}
+  return [found[i] for i in ids if i in found]
+
+def _touch(db: Session, model, *criteria):
+  db.query(model).filter(*criteria).update({model.version: model.version + 1}, synchronize_session=False)
+
+def get_artist(db: Session, artist_id: str, expand=()):
+  options = []
+  if "songs" in expand: options.append(selectinload(Artist.songs).selectinload(Song.artists))
+  if "albums" in expand: options.append(selectinload(Artist.albums).selectinload(Album.artists))
+  artist = db.query(Artist).options(*options).filter(Artist.id == artist_id).first()
+  if not artist: return None
+  if "songs" in expand: artist.expanded_songs = sorted(artist.songs, key=lambda s: (s.release_date or "", s.title_lowercase or ""), reverse=True)
+  if "albums" in expand: artist.expanded_albums = sorted(artist.albums, key=lambda a: (a.release_date or "", a.title_lowercase or ""), reverse=True)
+  return artist
+
+def get_artists(db: Session, skip: int = 0, limit: int = 50, cursor: Optional[str] = None):
+  return _rows(paginate(db.query(*_projection(Artist, schema.Artist)), [Artist.name_lowercase, Artist.id], cursor, skip, limit))
+
+def get_artists_by_ids(db: Session, artist_ids: List[str]):
+  return _in_order(db.query(Artist), Artist, artist_ids)
+
+def search_artists(db: Session, term: str, skip: int = 0, limit: int = 50):
+  return _search(db, Artist, Artist.name_lowercase, term, skip, limit)
 
 def create_artist(db: Session, **kwargs):
   artist = Artist(**kwargs)
   db.add(artist)
+  if artist.genres: artist_similarity_repo.queue_refresh(db, [artist.id])
   db.commit()
   db.refresh(artist)
   return artist
@@ -18,8 +71,11 @@ def create_artist(db: Session, **kwargs):
 def update_artist(db: Session, artist_id: str, **kwargs):
   artist = get_artist(db, artist_id)
   if not artist: return None
+  if not kwargs.get("name_lowercase"): kwargs.pop("name_lowercase", None)
+  if "name" in kwargs and not kwargs.get("name_lowercase"): kwargs["name_lowercase"] = kwargs["name"].lower()
   for key, value in kwargs.items():
     if hasattr(artist, key): setattr(artist, key, value)
+  if "genres" in kwargs: artist_similarity_repo.queue_refresh(db, [artist_id])
   db.commit()
   db.refresh(artist)
   return artist
@@ -27,41 +83,69 @@ def update_artist(db: Session, artist_id: str, **kwargs):
 def delete_artist(db: Session, artist_id: str):
   artist = get_artist(db, artist_id)
   if not artist: return False
+  _touch(db, Song, Song.artists.any(Artist.id == artist_id))
+  _touch(db, Album, Album.artists.any(Artist.id == artist_id))
+  artist_similarity_repo.queue_refresh(db, [artist_id])
   db.delete(artist)
   db.commit()
   return True
 
-def get_album(db: Session, album_id: str):
-  return db.query(Album).options(joinedload(Album.artists)).filter(Album.id == album_id).first()
+def get_album(db: Session, album_id: str, expand=()):
+  options = [selectinload(Album.artists)]
+  if "tracks" in expand: options.append(selectinload(Album.songs).selectinload(Song.artists))
+  album = db.query(Album).options(*options).filter(Album.id == album_id).first()
+  if not album: return None
+  if "artists" in expand: album.expanded_artists = album.artists
+  if "tracks" in expand: album.tracks = _tracks(db, album)
+  return album
+
+def _tracks(db: Session, album: Album):
+  songs = {song.id: song for song in album.songs}
+  missing = [i for i in album.tracklist or [] if i not in songs]
+  if missing: songs.update({song.id: song for song in get_songs_by_ids(db, missing)})
+  order = {song_id: n for n, song_id in enumerate(album.tracklist or [])}
+  return sorted(songs.values(), key=lambda s: (order.get(s.id, len(order)), s.title_lowercase or ""))
+
+def get_albums(db: Session, skip: int = 0, limit: int = 50, cursor: Optional[str] = None):
+  columns = _projection(Album, schema.Album, artist_ids=_artist_ids(album_artists, album_artists.c.album_id, Album))
+  return _rows(paginate(db.query(*columns), [Album.title_lowercase, Album.id], cursor, skip, limit))
+
+def get_albums_by_ids(db: Session, album_ids: List[str]):
+  return _in_order(db.query(Album).options(selectinload(Album.artists)), Album, album_ids)
 
-def get_albums(db: Session, skip: int = 0, limit: int = 50):
-  return db.query(Album).options(joinedload(Album.artists)).offset(skip).limit(limit).all()
+def search_albums(db: Session, term: str, skip: int = 0, limit: int = 50):
+  return _search(db, Album, Album.title_lowercase, term, skip, limit, joinedload(Album.artists))
 
 def create_album(db: Session, artist_ids: List[str] = None, **kwargs):
   album = Album(**kwargs)
   if artist_ids:
     artists = db.query(Artist).filter(Artist.id.in_(artist_ids)).all()
     album.artists = artists
+    artist_similarity_repo.queue_refresh(db, [a.id for a in artists])
   db.add(album)
   db.commit()
-  db.refresh(album)
-  return album
+  return get_album(db, album.id)
 
 def update_album(db: Session, album_id: str, artist_ids: List[str] = None, **kwargs):
   album = get_album(db, album_id)
   if not album: return None
+  if not kwargs.get("title_lowercase"): kwargs.pop("title_lowercase", None)
+  if "title" in kwargs and not kwargs.get("title_lowercase"): kwargs["title_lowercase"] = kwargs["title"].lower()
   for key, value in kwargs.items():
     if key != "artist_ids" and hasattr(album, key): setattr(album, key, value)
   if artist_ids is not None:
     artists = db.query(Artist).filter(Artist.id.in_(artist_ids)).all()
+    artist_similarity_repo.queue_refresh(db, [a.id for a in album.artists + artists])
     album.artists = artists
+    album.version = Album.version + 1
   db.commit()
-  db.refresh(album)
-  return album
+  return get_album(db, album.id)
 
 def delete_album(db: Session, album_id: str):
   album = get_album(db, album_id)
   if not album: return False
+  _touch(db, Song, Song.album_id == album_id)
+  artist_similarity_repo.queue_refresh(db, [a.id for a in album.artists])
   db.delete(album)
   db.commit()
   return True
@@ -69,68 +153,153 @@ def delete_album(db: Session, album_id: str):
 def get_song(db: Session, song_id: str):
   return db.query(Song).options(joinedload(Song.artists), joinedload(Song.album)).filter(Song.id == song_id).first()
 
-def get_songs(db: Session, skip: int = 0, limit: int = 50):
-  return db.query(Song).options(joinedload(Song.artists)).offset(skip).limit(limit).all()
+def get_songs(db: Session, skip: int = 0, limit: int = 50, cursor: Optional[str] = None):
+  columns = _projection(Song, schema.Song, artist_ids=_artist_ids(song_artists, song_artists.c.song_id, Song))
+  return _rows(paginate(db.query(*columns), [Song.title_lowercase, Song.id], cursor, skip, limit))
+
+def get_songs_by_ids(db: Session, song_ids: List[str]):
+  return _in_order(db.query(Song).options(selectinload(Song.artists)), Song, song_ids)
+
+def search_songs(db: Session, term: str, skip: int = 0, limit: int = 50):
+  return _search(db, Song, Song.title_lowercase, term, skip, limit, joinedload(Song.artists))
 
 def create_song(db: Session, artist_ids: List[str] = None, **kwargs):
   song = Song(**kwargs)
   if artist_ids:
     artists = db.query(Artist).filter(Artist.id.in_(artist_ids)).all()
     song.artists = artists
+    artist_similarity_repo.queue_refresh(db, [a.id for a in artists])
   db.add(song)
   db.commit()
-  db.refresh(song)
-  return song
+  return get_song(db, song.id)
 
 def update_song(db: Session, song_id: str, artist_ids: List[str] = None, **kwargs):
   song = get_song(db, song_id)
   if not song: return None
+  if not kwargs.get("title_lowercase"): kwargs.pop("title_lowercase", None)
+  if "title" in kwargs and not kwargs.get("title_lowercase"): kwargs["title_lowercase"] = kwargs["title"].lower()
   for key, value in kwargs.items():
     if key != "artist_ids" and hasattr(song, key): setattr(song, key, value)
   if artist_ids is not None:
     artists = db.query(Artist).filter(Artist.id.in_(artist_ids)).all()
+    artist_similarity_repo.queue_refresh(db, [a.id for a in song.artists + artists])
     song.artists = artists
+    song.version = Song.version + 1
   db.commit()
-  db.refresh(song)
-  return song
+  return get_song(db, song.id)
 
 def delete_song(db: Session, song_id: str):
   song = get_song(db, song_id)
   if not song: return False
+  artist_similarity_repo.queue_refresh(db, [a.id for a in song.artists])
   db.delete(song)
   db.commit()
   return True
 
-def get_playlist(db: Session, playlist_id: str):
-  return db.query(Playlist).options(joinedload(Playlist.songs)).filter(Playlist.id == playlist_id).first()
+POSITION_GAP = 1024
 
-def get_playlists_by_user(db: Session, user_id: str, skip: int = 0, limit: int = 50):
-  return db.query(Playlist).filter(Playlist.user_id == user_id).offset(skip).limit(limit).all()
+def get_playlist(db: Session, playlist_id: str, songs: bool = True):
+  return db.query(Playlist).options(*([selectinload(Playlist.songs)] if songs else [])).filter(Playlist.id == playlist_id).first()
+
+def get_playlists_by_user(db: Session, user_id: str, skip: int = 0, limit: int = 50, cursor: Optional[str] = None, songs: bool = False):
+  query = db.query(Playlist).options(*([selectinload(Playlist.songs)] if songs else [])).filter(Playlist.user_id == user_id)
+  page = paginate(query, [Playlist.created_at, Playlist.id], cursor, skip, limit, descending=True)
+  _summarize(db, page.items)
+  return page
+
+def _summarize(db: Session, playlists: List[Playlist]):
+  if not playlists: return
+  ids = [p.id for p in playlists]
+  tracks = select(playlist_songs.c.playlist_id, Song.duration, Song.cover_art_url, playlist_songs.c.position).join(
+    Song, Song.id == playlist_songs.c.song_id
+  ).where(playlist_songs.c.playlist_id.in_(ids)).cte("tracks")
+  stats = select(tracks.c.playlist_id, func.count().label("songs"), func.coalesce(func.sum(tracks.c.duration), 0).label("duration")).group_by(tracks.c.playlist_id).subquery()
+  # each distinct cover ranked by the position it first appears at, so repeats of one album can't crowd out the rest
+  firsts = select(tracks.c.playlist_id, tracks.c.cover_art_url, func.min(tracks.c.position).label("first")).where(
+    tracks.c.cover_art_url.isnot(None)
+  ).group_by(tracks.c.playlist_id, tracks.c.cover_art_url).subquery()
+  ranked = select(firsts, func.row_number().over(partition_by=firsts.c.playlist_id, order_by=(firsts.c.first, firsts.c.cover_art_url)).label("rank")).subquery()
+  covers = select(ranked.c.playlist_id, array_agg(aggregate_order_by(ranked.c.cover_art_url, ranked.c.rank)).label("urls")).where(
+    ranked.c.rank <= settings.PLAYLIST_SUMMARY_COVERS
+  ).group_by(ranked.c.playlist_id).subquery()
+  rows = db.execute(select(stats.c.playlist_id, stats.c.songs, stats.c.duration, covers.c.urls).outerjoin(covers, covers.c.playlist_id == stats.c.playlist_id)).all()
+  summary = {row[0]: row[1:] for row in rows}
+  for playlist in playlists:
+    playlist.song_count, playlist.total_duration, urls = summary.get(playlist.id, (0, 0, None))
+    playlist.cover_art_urls = urls or []
 
 def create_playlist(db: Session, song_ids: List[str] = None, **kwargs):
   playlist = Playlist(**kwargs)
-  if song_ids:
-    songs = db.query(Song).filter(Song.id.in_(song_ids)).all()
-    playlist.songs = songs
   db.add(playlist)
+  db.flush()
+  if song_ids: _insert_songs(db, playlist.id, song_ids, 0)
   db.commit()
-  db.refresh(playlist)
-  return playlist
+  db.expire(playlist, ["songs"])
+  return get_playlist(db, playlist.id)
 
 def update_playlist(db: Session, playlist_id: str, song_ids: List[str] = None, **kwargs):
-  playlist = get_playlist(db, playlist_id)
+  playlist = get_playlist(db, playlist_id, songs=False)
   if not playlist: return None
   for key, value in kwargs.items():
     if key != "song_ids" and hasattr(playlist, key): setattr(playlist, key, value)
   if song_ids is not None:
-    songs = db.query(Song).filter(Song.id.in_(song_ids)).all()
-    playlist.songs = songs
+    db.execute(delete(playlist_songs).where(playlist_songs.c.playlist_id == playlist_id))
+    _insert_songs(db, playlist_id, song_ids, 0)
+  db.commit()
+  db.expire(playlist, ["songs"])
+  return get_playlist(db, playlist.id)
+
+def _insert_songs(db: Session, playlist_id: str, song_ids: List[str], start: int) -> int:
+  song_ids = list(dict.fromkeys(song_ids))
+  known = set(db.scalars(select(Song.id).where(Song.id.in_(song_ids)))) if song_ids else set()
+  rows = [{"playlist_id": playlist_id, "song_id": i, "position": start + POSITION_GAP * n} for n, i in enumerate([i for i in song_ids if i in known], 1)]
+  if not rows: return 0
+  return db.execute(insert(playlist_songs).values(rows).on_conflict_do_nothing()).rowcount
+
+def _position(db: Session, playlist_id: str, song_id: str):
+  return db.scalar(select(playlist_songs.c.position).where(playlist_songs.c.playlist_id == playlist_id, playlist_songs.c.song_id == song_id))
+
+def _touch_playlist(db: Session, playlist_id: str):
+  db.execute(update(Playlist).where(Playlist.id == playlist_id).values(updated_at=datetime.now(timezone.utc)))
+
+def _renumber(db: Session, playlist_id: str):
+  ranked = select(
+    playlist_songs.c.song_id, (func.row_number().over(order_by=(playlist_songs.c.position, playlist_songs.c.song_id)) * POSITION_GAP).label("position")
+  ).where(playlist_songs.c.playlist_id == playlist_id).subquery()
+  db.execute(update(playlist_songs).where(playlist_songs.c.playlist_id == playlist_id, playlist_songs.c.song_id == ranked.c.song_id).values(position=ranked.c.position))
+
+def append_playlist_songs(db: Session, playlist_id: str, song_ids: List[str]):
+  last = db.scalar(select(func.max(playlist_songs.c.position)).where(playlist_songs.c.playlist_id == playlist_id))
+  added = _insert_songs(db, playlist_id, song_ids, last or 0)
+  _touch_playlist(db, playlist_id)
+  db.commit()
+  return added
+
+def remove_playlist_song(db: Session, playlist_id: str, song_id: str):
+  removed = db.execute(delete(playlist_songs).where(playlist_songs.c.playlist_id == playlist_id, playlist_songs.c.song_id == song_id)).rowcount
+  if removed: _touch_playlist(db, playlist_id)
   db.commit()
-  db.refresh(playlist)
-  return playlist
+  return bool(removed)
+
+def move_playlist_song(db: Session, playlist_id: str, song_id: str, after_song_id: Optional[str] = None):
+  if _position(db, playlist_id, song_id) is None: return None
+  low = _position(db, playlist_id, after_song_id) if after_song_id else None
+  if after_song_id and low is None: return None
+  following = select(func.min(playlist_songs.c.position)).where(playlist_songs.c.playlist_id == playlist_id, playlist_songs.c.song_id != song_id)
+  high = db.scalar(following.where(playlist_songs.c.position > low) if low is not None else following)
+  if low is None: position = (high or 0) - POSITION_GAP
+  elif high is None: position = low + POSITION_GAP
+  elif high - low >= 2: position = (low + high) // 2
+  else:
+    _renumber(db, playlist_id)
+    return move_playlist_song(db, playlist_id, song_id, after_song_id)
+  db.execute(update(playlist_songs).where(playlist_songs.c.playlist_id == playlist_id, playlist_songs.c.song_id == song_id).values(position=position))
+  _touch_playlist(db, playlist_id)
+  db.commit()
+  return position
 
 def delete_playlist(db: Session, playlist_id: str):
-  playlist = get_playlist(db, playlist_id)
+  playlist = get_playlist(db, playlist_id, songs=False)
   if not playlist: return False
   db.delete(playlist)
   db.commit()
@@ -139,32 +308,37 @@ def delete_playlist(db: Session, playlist_id: str):
 def get_review(db: Session, review_id: str):
   return db.query(Review).filter(Review.id == review_id).first()
 
-def get_reviews_by_user(db: Session, user_id: str, skip: int = 0, limit: int = 50):
-  return db.query(Review).filter(Review.user_id == user_id).offset(skip).limit(limit).all()
+def get_reviews_by_user(db: Session, user_id: str, skip: int = 0, limit: int = 50, cursor: Optional[str] = None):
+  return paginate(db.query(Review).filter(Review.user_id == user_id), [Review.created_at, Review.id], cursor, skip, limit, descending=True)
+
+REVIEW_SORTS = {
+  "newest": [Review.created_at, Review.id],
+  "liked": [Review.likes_count, Review.id],
+  "helpful": [Review.helpful_score, Review.id],
+}
 
-def get_reviews_by_entity(db: Session, entity_id: str, entity_type: str, skip: int = 0, limit: int = 50):
-  return db.query(Review).filter(Review.entity_id == entity_id, Review.entity_type == entity_type).offset(skip).limit(limit).all()
+def get_reviews_by_entity(db: Session, entity_id: str, entity_type: str, skip: int = 0, limit: int = 50, cursor: Optional[str] = None, sort: str = "newest"):
+  query = db.query(Review).filter(Review.entity_id == entity_id, Review.entity_type == entity_type)
+  return paginate(query, REVIEW_SORTS[sort], cursor, skip, limit, descending=True)
 
 def create_review(db: Session, **kwargs):
   review = Review(**kwargs)
   db.add(review)
-  entity_type = kwargs.get("entity_type")
-  entity_id = kwargs.get("entity_id")
-  if entity_type == "song":
-    song = db.query(Song).filter(Song.id == entity_id).first()
-    if song: song.review_count += 1
-  elif entity_type == "album":
-    album = db.query(Album).filter(Album.id == entity_id).first()
-    if album: album.review_count += 1
+  bump_rating(db, review.entity_type, review.entity_id, {review.rating: 1})
+  db.flush()
+  feed_repo.fan_out(db, review.user_id, "review", review.id, review.created_at)
+  trending_repo.record_event(db, "review", review.entity_type, review.entity_id)
   db.commit()
   db.refresh(review)
   return review
 
 def update_review(db: Session, review_id: str, **kwargs):
-  review = get_review(db, review_id)
+  review = db.query(Review).filter(Review.id == review_id).with_for_update().populate_existing().first()
   if not review: return None
+  previous = review.rating
   for key, value in kwargs.items():
     if hasattr(review, key): setattr(review, key, value)
+  if review.rating != previous: bump_rating(db, review.entity_type, review.entity_id, {previous: -1, review.rating: 1})
   db.commit()
   db.refresh(review)
   return review
@@ -172,54 +346,57 @@ def update_review(db: Session, review_id: str, **kwargs):
 def delete_review(db: Session, review_id: str):
   review = get_review(db, review_id)
   if not review: return False
-  entity_type, entity_id = review.entity_type, review.entity_id
+  entity_type, entity_id, rating = review.entity_type, review.entity_id, review.rating
   db.delete(review)
-  if entity_type == "song":
-    song = db.query(Song).filter(Song.id == entity_id).first()
-    if song: song.review_count = max(0, song.review_count - 1)
-  elif entity_type == "album":
-    album = db.query(Album).filter(Album.id == entity_id).first()
-    if album: album.review_count = max(0, album.review_count - 1)
+  bump_rating(db, entity_type, entity_id, {rating: -1})
+  feed_repo.remove_activity(db, "review", review_id)
   db.commit()
   return True
 
 def get_like(db: Session, user_id: str, entity_id: str, entity_type: str):
   return db.query(Like).filter(Like.user_id == user_id, Like.entity_id == entity_id, Like.entity_type == entity_type).first()
 
-def get_likes_by_user(db: Session, user_id: str, skip: int = 0, limit: int = 50):
-  return db.query(Like).filter(Like.user_id == user_id).offset(skip).limit(limit).all()
+def get_likes_by_user(db: Session, user_id: str, skip: int = 0, limit: int = 50, cursor: Optional[str] = None):
+  return paginate(db.query(Like).filter(Like.user_id == user_id), [Like.created_at, Like.id], cursor, skip, limit, descending=True)
+
+def get_like_by_id(db: Session, like_id: str):
+  return db.query(Like).filter(Like.id == like_id).first()
 
 def create_like(db: Session, **kwargs):
   like = Like(**kwargs)
   db.add(like)
-  entity_type = kwargs.get("entity_type")
-  entity_id = kwargs.get("entity_id")
-  if entity_type == "song":
-    song = db.query(Song).filter(Song.id == entity_id).first()
-    if song: song.likes_count += 1
-  elif entity_type == "album":
-    album = db.query(Album).filter(Album.id == entity_id).first()
-    if album: album.likes_count += 1
-  elif entity_type == "review":
-    review = db.query(Review).filter(Review.id == entity_id).first()
-    if review: review.likes_count += 1
+  bump_likes(db, kwargs.get("entity_type"), kwargs.get("entity_id"), 1)
+  db.flush()
+  feed_repo.fan_out(db, like.user_id, "like", like.id, like.created_at)
+  trending_repo.record_event(db, "like", like.entity_type, like.entity_id)
   db.commit()
+  liked_set_cache.update(like.user_id, lambda liked: liked and liked.added(like.entity_type, like.entity_id, like.id))
   db.refresh(like)
   return like
 
 def delete_like(db: Session, like_id: str):
-  like = db.query(Like).filter(Like.id == like_id).first()
+  like = get_like_by_id(db, like_id)
   if not like: return False
-  entity_type, entity_id = like.entity_type, like.entity_id
+  user_id, entity_type, entity_id = like.user_id, like.entity_type, like.entity_id
   db.delete(like)
-  if entity_type == "song":
-    song = db.query(Song).filter(Song.id == entity_id).first()
-    if song: song.likes_count = max(0, song.likes_count - 1)
-  elif entity_type == "album":
-    album = db.query(Album).filter(Album.id == entity_id).first()
-    if album: album.likes_count = max(0, album.likes_count - 1)
-  elif entity_type == "review":
-    review = db.query(Review).filter(Review.id == entity_id).first()
-    if review: review.likes_count = max(0, review.likes_count - 1)
-  db.commit()
-  return True
\ No newline at end of file
+  bump_likes(db, entity_type, entity_id, -1)
+  feed_repo.remove_activity(db, "like", like_id)
+  db.commit()
+  liked_set_cache.update(user_id, lambda liked: liked and liked.discarded(entity_type, entity_id))
+  return True
+
+def get_liked_set(db: Session, user_id: str) -> Optional[LikedSet]:
+  liked = liked_set_cache.get(user_id)
+  if liked is not None: return liked or None
+  epoch = liked_set_cache.epoch(user_id)
+  rows = db.execute(select(Like.entity_type, Like.entity_id, Like.id).where(Like.user_id == user_id).limit(settings.LIKED_SET_MAX_LIKES + 1)).all()
+  liked = LikedSet(rows) if len(rows) <= settings.LIKED_SET_MAX_LIKES else False
+  liked_set_cache.set(user_id, liked, epoch)
+  return liked or None
+
+def check_likes(db: Session, user_id: str, refs: List[Tuple[str, str]]):
+  liked = get_liked_set(db, user_id)
+  if liked is not None: return {ref: liked.get(*ref) for ref in refs}
+  rows = db.execute(select(Like.entity_type, Like.entity_id, Like.id).where(Like.user_id == user_id, tuple_(Like.entity_type, Like.entity_id).in_(refs))).all()
+  found = {(entity_type, entity_id): like_id for entity_type, entity_id, like_id in rows}
+  return {ref: found.get(ref) for ref in refs}
\ No newline at end of file
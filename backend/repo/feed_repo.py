@@ -0,0 +1,91 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import delete, exists, literal, select, true, tuple_, union_all, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.pagination import Page, decode_cursor, encode_cursor
+from ..models import Follow, UserProfile, Review, Like, FeedItem
+
+FEED_KEYS = [FeedItem.created_at, FeedItem.activity_id]
+ACTIVITY_MODELS = {"review": Review, "like": Like}
+
+def _fans_out(actor_id: str):
+  return ~exists().where(UserProfile.user_id == actor_id, UserProfile.feed_pulled)
+
+def fan_out(db: Session, actor_id: str, activity_type: str, activity_id: str, created_at: datetime):
+  """Copy an activity into followers' timelines, unless the actor is read by pull.
+
+  An actor switches to pull mode the first time they write with more than FEED_FANOUT_MAX_FOLLOWERS followers and
+  stays there: readers pull everything such an actor wrote, so nothing disappears if they later lose followers.
+  """
+  db.execute(update(UserProfile).where(
+    UserProfile.user_id == actor_id, UserProfile.feed_pulled.is_(False), UserProfile.followers_count > settings.FEED_FANOUT_MAX_FOLLOWERS
+  ).values(feed_pulled=True))
+  rows = select(Follow.follower_id, literal(activity_type), literal(activity_id), literal(actor_id), literal(created_at)).where(
+    Follow.following_id == actor_id, _fans_out(actor_id)
+  )
+  columns = [FeedItem.user_id, FeedItem.activity_type, FeedItem.activity_id, FeedItem.actor_id, FeedItem.created_at]
+  db.execute(insert(FeedItem).from_select(columns, rows).on_conflict_do_nothing())
+
+def remove_activity(db: Session, activity_type: str, activity_id: str):
+  db.execute(delete(FeedItem).where(FeedItem.activity_type == activity_type, FeedItem.activity_id == activity_id))
+
+def backfill(db: Session, follower_id: str, actor_id: str):
+  columns = [FeedItem.user_id, FeedItem.activity_type, FeedItem.activity_id, FeedItem.actor_id, FeedItem.created_at]
+  for activity_type, model in ACTIVITY_MODELS.items():
+    recent = select(literal(follower_id), literal(activity_type), model.id, model.user_id, model.created_at).where(
+      model.user_id == actor_id, _fans_out(actor_id)
+    ).order_by(model.created_at.desc()).limit(settings.FEED_BACKFILL)
+    db.execute(insert(FeedItem).from_select(columns, recent).on_conflict_do_nothing())
+
+def drop_actor(db: Session, follower_id: str, actor_id: str):
+  db.execute(delete(FeedItem).where(FeedItem.user_id == follower_id, FeedItem.actor_id == actor_id))
+
+def _timeline(user_id: str, bound, limit: int):
+  stmt = select(FeedItem.activity_type, FeedItem.activity_id, FeedItem.actor_id, FeedItem.created_at).where(FeedItem.user_id == user_id)
+  if bound is not None: stmt = stmt.where(tuple_(FeedItem.created_at, FeedItem.activity_id) < bound)
+  return select(stmt.order_by(FeedItem.created_at.desc(), FeedItem.activity_id.desc()).limit(limit).subquery())
+
+def _pulled(user_id: str, activity_type: str, model, bound, limit: int):
+  heavy = select(Follow.following_id.label("actor_id")).join(UserProfile, UserProfile.user_id == Follow.following_id).where(
+    Follow.follower_id == user_id, UserProfile.feed_pulled
+  ).subquery()
+  recent = select(model.id, model.created_at).where(model.user_id == heavy.c.actor_id)
+  if bound is not None: recent = recent.where(tuple_(model.created_at, model.id) < bound)
+  recent = recent.order_by(model.created_at.desc(), model.id.desc()).limit(limit).lateral()
+  return select(literal(activity_type).label("activity_type"), recent.c.id.label("activity_id"), heavy.c.actor_id, recent.c.created_at).select_from(
+    heavy.join(recent, true())
+  )
+
+def get_feed(db: Session, user_id: str, cursor: Optional[str] = None, limit: int = 20):
+  bound = tuple_(*decode_cursor(cursor, FEED_KEYS)) if cursor else None
+  merged = union_all(
+    _timeline(user_id, bound, limit + 1),
+    *[_pulled(user_id, activity_type, model, bound, limit + 1) for activity_type, model in ACTIVITY_MODELS.items()]
+  ).subquery()
+  rows = db.execute(select(merged).order_by(merged.c.created_at.desc(), merged.c.activity_id.desc()).limit(limit + 1)).all()
+  next_cursor = encode_cursor([rows[limit - 1].created_at, rows[limit - 1].activity_id]) if len(rows) > limit else None
+  seen, entries = set(), []
+  for row in rows[:limit]:
+    if (row.activity_type, row.activity_id) in seen: continue
+    seen.add((row.activity_type, row.activity_id))
+    entries.append(row)
+  return Page(_hydrate(db, entries), next_cursor)
+
+def _hydrate(db: Session, rows):
+  loaded = {}
+  for activity_type, model in ACTIVITY_MODELS.items():
+    ids = [r.activity_id for r in rows if r.activity_type == activity_type]
+    if ids: loaded.update({(activity_type, obj.id): obj for obj in db.query(model).filter(model.id.in_(ids)).all()})
+  actor_ids = {r.actor_id for r in rows}
+  actors = {p.user_id: p for p in db.query(UserProfile).filter(UserProfile.user_id.in_(actor_ids)).all()} if actor_ids else {}
+  entries = []
+  for r in rows:
+    activity = loaded.get((r.activity_type, r.activity_id))
+    if activity is None: continue
+    entries.append({
+      "activity_type": r.activity_type, "activity_id": r.activity_id, "created_at": r.created_at,
+      "actor": actors.get(r.actor_id), r.activity_type: activity
+    })
+  return entries
@@ -0,0 +1,86 @@
+import asyncio, threading, time
+from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.graph import FollowGraph
+from ..database import AsyncSessionLocal
+from ..models import Follow, UserProfile
+
+_graph = None
+_built_at = 0.0
+_building = False
+_replay = []
+_build_lock = threading.Lock()
+_build_task = None
+
+async def _build() -> FollowGraph:
+  global _graph, _built_at, _building
+  with _build_lock:
+    _building = True
+    _replay.clear()
+  try:
+    async with AsyncSessionLocal() as db:
+      edges = (await db.execute(select(Follow.follower_id, Follow.following_id))).all()
+    graph = await asyncio.to_thread(FollowGraph, edges, settings.FOLLOW_GRAPH_COMPACT_AFTER)
+  except BaseException:
+    with _build_lock: _building = False
+    raise
+  with _build_lock:
+    for apply, follower_id, following_id in _replay: apply(graph, follower_id, following_id)
+    _replay.clear()
+    _graph, _built_at, _building = graph, time.monotonic(), False
+    return graph
+
+def _settled(task):
+  global _build_task
+  _build_task = None
+  if not task.cancelled() and task.exception(): print(f"Warning: failed to build follow graph: {task.exception()}")
+
+async def get_graph() -> FollowGraph:
+  """Return the shared graph, rebuilding it when stale.
+
+  Builds are single-flight: one task scans the edges on its own session and builds the CSR arrays in a worker
+  thread, off the event loop. Callers keep using the previous graph while it runs, or await it when there is none
+  yet, and follows recorded meanwhile are replayed onto the new graph before it is swapped in.
+  """
+  global _build_task
+  if _graph is not None and time.monotonic() - _built_at <= settings.FOLLOW_GRAPH_REFRESH_SECONDS: return _graph
+  if _build_task is None:
+    _build_task = asyncio.ensure_future(_build())
+    _build_task.add_done_callback(_settled)
+  if _graph is not None: return _graph
+  return await asyncio.shield(_build_task)
+
+def _record(apply, follower_id: str, following_id: str):
+  with _build_lock:
+    if _building: _replay.append((apply, follower_id, following_id))
+    graph = _graph
+  if graph is not None: apply(graph, follower_id, following_id)
+
+def record_follow(follower_id: str, following_id: str):
+  _record(FollowGraph.add, follower_id, following_id)
+
+def record_unfollow(follower_id: str, following_id: str):
+  _record(FollowGraph.remove, follower_id, following_id)
+
+def _cards(db: Session, user_ids: List[str]):
+  found = {p.user_id: p for p in db.query(UserProfile).filter(UserProfile.user_id.in_(user_ids)).all()} if user_ids else {}
+  return [found[i] for i in user_ids if i in found]
+
+async def get_relationship(db: AsyncSession, viewer_id: str, user_id: str):
+  graph = await get_graph()
+  return {"following": graph.follows(viewer_id, user_id), "followed_by": graph.follows(user_id, viewer_id)}
+
+async def get_mutuals(db: AsyncSession, viewer_id: str, user_id: str, limit: int = 20):
+  graph = await get_graph()
+  return await db.run_sync(_cards, graph.mutuals(viewer_id, user_id, limit))
+
+async def get_suggestions(db: AsyncSession, user_id: str, limit: int = 20):
+  graph = await get_graph()
+  ranked = graph.suggestions(user_id, limit, settings.FOLLOW_SUGGESTION_FANOUT)
+  overlap = dict(ranked)
+  cards = await db.run_sync(_cards, [i for i, _ in ranked])
+  for card in cards: card.overlap = overlap[card.user_id]
+  return cards
@@ -0,0 +1,81 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+import numpy as np
+from sqlalchemy import case, delete, func, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.similarity import interning, cosine_neighbors
+from ..models import Review, Like, ItemSimilarity
+from . import feature_repo
+
+RECOMMENDABLE = ("song", "album")
+HYDRATE = {"song": feature_repo.get_songs_by_ids, "album": feature_repo.get_albums_by_ids}
+
+def _signals(entity_type: str):
+  """One (user, item, weight) row per pair: a like counts fully, a review by how warm its rating is"""
+  liked = select(Like.user_id, Like.entity_id, literal(1.0).label("weight")).where(Like.entity_type == entity_type)
+  reviewed = select(Review.user_id, Review.entity_id, case({5: 1.0, 4: 0.75, 3: 0.25}, value=Review.rating, else_=0.0).label("weight")).where(
+    Review.entity_type == entity_type, Review.rating >= 3
+  )
+  signals = union_all(liked, reviewed).subquery()
+  return select(signals.c.user_id, signals.c.entity_id, func.max(signals.c.weight)).group_by(signals.c.user_id, signals.c.entity_id)
+
+def build_item_similarities(db: Session, entity_type: str) -> int:
+  """Recompute the top-N item neighbors for one entity type and swap them in within a single transaction"""
+  rows = db.execute(_signals(entity_type)).all()
+  if not rows: return 0
+  users, items, weights = zip(*rows)
+  user_codes, user_ids = interning(users)
+  item_codes, item_ids = interning(items)
+  neighbors = cosine_neighbors(
+    item_codes, user_codes, np.array(weights), len(item_ids), len(user_ids),
+    settings.RECS_TOP_N, settings.RECS_SHRINKAGE, settings.RECS_BLOCK_ROWS
+  )
+  now = datetime.now(timezone.utc)
+  db.execute(delete(ItemSimilarity).where(ItemSimilarity.entity_type == entity_type))
+  built, batch = 0, []
+  for item, similar, scores in neighbors:
+    scores = np.round(scores, 6)
+    similar, scores = similar[scores > 0], scores[scores > 0]
+    if not len(similar): continue
+    batch.append({
+      "entity_type": entity_type, "entity_id": item_ids[item], "similar_ids": [item_ids[i] for i in similar],
+      "scores": [float(s) for s in scores], "updated_at": now
+    })
+    if len(batch) >= 1000:
+      db.execute(insert(ItemSimilarity), batch)
+      built, batch = built + len(batch), []
+  if batch: db.execute(insert(ItemSimilarity), batch)
+  db.commit()
+  return built + len(batch)
+
+def _hydrate(db: Session, entity_type: str, ranked):
+  found = {obj.id: obj for obj in HYDRATE[entity_type](db, [entity_id for entity_id, _, _ in ranked])}
+  return [
+    {"entity_type": entity_type, "entity_id": entity_id, "score": score, "because_id": because_id, entity_type: found[entity_id]}
+    for entity_id, score, because_id in ranked if entity_id in found
+  ]
+
+def get_similar_items(db: Session, entity_type: str, entity_id: str, limit: int = 20):
+  row = db.execute(select(ItemSimilarity.similar_ids, ItemSimilarity.scores).where(
+    ItemSimilarity.entity_type == entity_type, ItemSimilarity.entity_id == entity_id
+  )).first()
+  if not row: return []
+  return _hydrate(db, entity_type, [(i, s, None) for i, s in zip(row.similar_ids[:limit], row.scores[:limit])])
+
+def get_recommendations(db: Session, user_id: str, entity_type: str, limit: int = 20):
+  """Sum neighbor scores across the user's most recent likes, crediting each pick to the like that contributed most"""
+  seeds = select(Like.entity_id).where(Like.user_id == user_id, Like.entity_type == entity_type).order_by(Like.created_at.desc()).limit(settings.RECS_SEED_LIKES).subquery()
+  rows = db.execute(select(ItemSimilarity.entity_id, ItemSimilarity.similar_ids, ItemSimilarity.scores).where(
+    ItemSimilarity.entity_type == entity_type, ItemSimilarity.entity_id.in_(select(seeds.c.entity_id))
+  )).all()
+  liked = feature_repo.get_liked_set(db, user_id)
+  seen = {seed for seed, _, _ in rows}
+  totals, best = defaultdict(float), {}
+  for seed, similar_ids, scores in rows:
+    for similar_id, score in zip(similar_ids, scores):
+      if similar_id in seen or (liked is not None and liked.get(entity_type, similar_id)): continue
+      totals[similar_id] += score
+      if similar_id not in best or score > best[similar_id][0]: best[similar_id] = (score, seed)
+  ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:limit]
+  return _hydrate(db, entity_type, [(i, round(score, 6), best[i][1]) for i, score in ranked])
@@ -0,0 +1,36 @@
+from sqlalchemy import case, func, literal, null, or_, select, union_all
+from sqlalchemy.orm import Session
+from ..models import Artist, Album, Song, UserProfile
+
+def search_pattern(term: str):
+  escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+  return f"%{escaped}%"
+
+def search_rank(column, term: str):
+  prefix = search_pattern(term)[1:]
+  return case((column == term, 2.0), (column.like(prefix, escape="\\"), 1.0), else_=0.0) + func.similarity(column, term)
+
+def search_match(column, term: str):
+  return column.like(search_pattern(term), escape="\\")
+
+def _branch(entity_type: str, id_col, title, image_url, username, rank, match, per_type: int):
+  ranked = select(
+    literal(entity_type).label("entity_type"), id_col.label("id"), title.label("title"),
+    image_url.label("image_url"), username.label("username"), rank.label("rank")
+  ).where(match).order_by(rank.desc(), id_col).limit(per_type).subquery()
+  return select(ranked)
+
+def search_all(db: Session, term: str, per_type: int = 5, limit: int = 20):
+  term = term.strip().lower()
+  username, display_name = func.lower(UserProfile.username), func.lower(UserProfile.display_name)
+  branches = [
+    _branch("user", UserProfile.user_id, func.coalesce(UserProfile.display_name, UserProfile.username), UserProfile.photo_url, UserProfile.username,
+      func.greatest(search_rank(username, term), func.coalesce(search_rank(display_name, term), 0.0)),
+      or_(search_match(username, term), search_match(display_name, term)), per_type),
+    _branch("artist", Artist.id, Artist.name, Artist.image_url, null(), search_rank(Artist.name_lowercase, term), search_match(Artist.name_lowercase, term), per_type),
+    _branch("album", Album.id, Album.title, Album.cover_art_url, null(), search_rank(Album.title_lowercase, term), search_match(Album.title_lowercase, term), per_type),
+    _branch("song", Song.id, Song.title, Song.cover_art_url, null(), search_rank(Song.title_lowercase, term), search_match(Song.title_lowercase, term), per_type),
+  ]
+  merged = union_all(*branches).subquery()
+  stmt = select(merged).order_by(merged.c.rank.desc(), merged.c.entity_type, merged.c.id).limit(limit)
+  return db.execute(stmt).all()
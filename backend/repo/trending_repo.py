@@ -0,0 +1,79 @@
+import math, random
+from collections import defaultdict
+from datetime import datetime, timezone
+from sqlalchemy import and_, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, joinedload
+from ..core.config import settings
+from ..models import Artist, Album, Song, TrendingScore, TrendingScoreShard
+from ..models.feature import song_artists, album_artists
+
+TRENDING_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+EVENT_WEIGHTS = {"like": 1.0, "review": 3.0}
+TRENDING_MODELS = {"song": Song, "album": Album, "artist": Artist}
+CREDIT_TABLES = {"song": (song_artists, song_artists.c.song_id), "album": (album_artists, album_artists.c.album_id)}
+
+def _log_weight(event: str, at: datetime):
+  tau = settings.TRENDING_HALF_LIFE_HOURS * 3600 / math.log(2)
+  return math.log(EVENT_WEIGHTS[event]) + (at - TRENDING_EPOCH).total_seconds() / tau
+
+def _logaddexp(a: float, b: float) -> float:
+  hi, lo = max(a, b), min(a, b)
+  return hi + math.log1p(math.exp(lo - hi))
+
+def _upsert(stmt, model=TrendingScore, keys=("entity_type", "entity_id")):
+  hi, lo = func.greatest(model.score, stmt.excluded.score), func.least(model.score, stmt.excluded.score)
+  return stmt.on_conflict_do_update(
+    index_elements=[getattr(model, key) for key in keys],
+    set_={"score": hi + func.ln(1 + func.exp(lo - hi)), "updated_at": func.greatest(model.updated_at, stmt.excluded.updated_at)}
+  )
+
+def record_event(db: Session, event: str, entity_type: str, entity_id: str, at: datetime = None):
+  """Add one event's decayed weight to the entity's trending score and, through its credits, to its artists'.
+
+  With COUNTER_SHARDS > 1 the increment lands on a random shard row and reaches trending_scores (artists included)
+  in flush_trending_shards, so a hot song's likes don't serialize on its score row, nor on its artists'.
+  """
+  if entity_type not in CREDIT_TABLES: return
+  at = at or datetime.now(timezone.utc)
+  score = _log_weight(event, at)
+  if settings.COUNTER_SHARDS > 1:
+    stmt = insert(TrendingScoreShard).values(entity_type=entity_type, entity_id=entity_id, shard=random.randrange(settings.COUNTER_SHARDS), score=score, updated_at=at)
+    db.execute(_upsert(stmt, TrendingScoreShard, ("entity_type", "entity_id", "shard")))
+    return
+  db.execute(_upsert(insert(TrendingScore).values(entity_type=entity_type, entity_id=entity_id, score=score, updated_at=at)))
+  table, key = CREDIT_TABLES[entity_type]
+  credited = select(literal("artist"), table.c.artist_id, literal(score), literal(at)).where(key == entity_id)
+  columns = [TrendingScore.entity_type, TrendingScore.entity_id, TrendingScore.score, TrendingScore.updated_at]
+  db.execute(_upsert(insert(TrendingScore).from_select(columns, credited)))
+
+def _apply(db: Session, scores: dict):
+  # one row per key and a stable order: ON CONFLICT can't touch a row twice, and concurrent flushes lock alike
+  rows = [{"entity_type": t, "entity_id": i, "score": score, "updated_at": at} for (t, i), (score, at) in sorted(scores.items())]
+  if rows: db.execute(_upsert(insert(TrendingScore).values(rows)))
+
+def _credit(db: Session, entity_type: str, entity_ids):
+  table, key = CREDIT_TABLES[entity_type]
+  return db.execute(select(key, table.c.artist_id).where(key.in_(entity_ids))).all()
+
+def flush_trending_shards(db: Session):
+  rows = db.execute(delete(TrendingScoreShard).returning(
+    TrendingScoreShard.entity_type, TrendingScoreShard.entity_id, TrendingScoreShard.score, TrendingScoreShard.updated_at
+  )).all()
+  totals, by_type = {}, defaultdict(list)
+  def add(key, score, at):
+    if key in totals: score, at = _logaddexp(totals[key][0], score), max(totals[key][1], at)
+    totals[key] = (score, at)
+  for entity_type, entity_id, score, at in rows: add((entity_type, entity_id), score, at)
+  for entity_type, entity_id in list(totals): by_type[entity_type].append(entity_id)
+  for entity_type, entity_ids in by_type.items():
+    for entity_id, artist_id in _credit(db, entity_type, entity_ids): add(("artist", artist_id), *totals[(entity_type, entity_id)])
+  _apply(db, totals)
+  db.commit()
+  return len(totals)
+
+def get_trending(db: Session, entity_type: str, limit: int = 20):
+  model = TRENDING_MODELS[entity_type]
+  query = db.query(model).join(TrendingScore, and_(TrendingScore.entity_type == entity_type, TrendingScore.entity_id == model.id))
+  if model is not Artist: query = query.options(joinedload(model.artists))
+  return query.order_by(TrendingScore.score.desc()).limit(limit).all()
@@ -1,10 +1,19 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, func, literal, or_
+from typing import Optional
+from sqlalchemy.orm import Session, aliased, joinedload, contains_eager, load_only
 from ..models import User, UserProfile, Follow
-from ..core.security import hash_password
+from ..core.cache import principal_cache
+from .search_repo import search_match, search_rank
+from ..core.pagination import paginate
+from .counter_repo import bump
+from . import feed_repo, graph_repo
 
 def get_user_by_id(db: Session, user_id: str):
   return db.query(User).options(joinedload(User.profile)).filter(User.id == user_id).first()
 
+def get_user_version(db: Session, user_id: str) -> Optional[int]:
+  return db.query(User.version).filter(User.id == user_id).scalar()
+
 def get_user_by_email(db: Session, email: str):
   return db.query(User).options(joinedload(User.profile)).filter(User.email == email).first()
 
@@ -12,6 +21,17 @@ def get_user_by_username(db: Session, username: str):
   profile = db.query(UserProfile).filter(UserProfile.username == username).first()
   return db.query(User).options(joinedload(User.profile)).filter(User.id == profile.user_id).first() if profile else None
 
+def search_users(db: Session, term: str, skip: int = 0, limit: int = 20):
+  term = term.strip().lower()
+  username, display_name = func.lower(UserProfile.username), func.lower(UserProfile.display_name)
+  rank = func.greatest(search_rank(username, term), func.coalesce(search_rank(display_name, term), 0.0))
+  return db.query(User).join(User.profile).options(contains_eager(User.profile)).filter(
+    or_(search_match(username, term), search_match(display_name, term))
+  ).order_by(rank.desc(), User.id).offset(skip).limit(limit).all()
+
+def get_user_profile(db: Session, user_id: str):
+  return db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+
 def create_user(db: Session, id: str, email: str = None, role: str = "user", **profile_kwargs):
   user = User(id=id, email=email, role=role)
   db.add(user)
@@ -22,9 +42,8 @@ def create_user(db: Session, id: str, email: str = None, role: str = "user", **p
   db.refresh(user)
   return user
 
-def create_user_with_password(db: Session, id: str, email: str, password: str, **profile_kwargs):
-  hashed = hash_password(password)
-  user = User(id=id, email=email, role="user", password_hash=hashed)
+def create_user_with_password(db: Session, id: str, email: str, password_hash: str, **profile_kwargs):
+  user = User(id=id, email=email, role="user", password_hash=password_hash)
   db.add(user)
   db.flush()
   profile = UserProfile(user_id=id, **profile_kwargs)
@@ -39,15 +58,19 @@ def update_user(db: Session, user_id: str, **kwargs):
   for key, value in kwargs.items():
     if hasattr(user, key): setattr(user, key, value)
   db.commit()
+  principal_cache.invalidate(user_id)
   db.refresh(user)
   return user
 
 def update_user_profile(db: Session, user_id: str, **kwargs):
-  profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+  profile = get_user_profile(db, user_id)
   if not profile: return None
   for key, value in kwargs.items():
     if hasattr(profile, key): setattr(profile, key, value)
+  # the cached principal embeds the profile, so its edits move the user's version stamp too
+  db.query(User).filter(User.id == user_id).update({User.version: User.version + 1}, synchronize_session=False)
   db.commit()
+  principal_cache.invalidate(user_id)
   db.refresh(profile)
   return profile
 
@@ -56,35 +79,53 @@ def delete_user(db: Session, user_id: str):
   if not user: return False
   db.delete(user)
   db.commit()
+  principal_cache.invalidate(user_id)
   return True
 
+def get_follow(db: Session, follower_id: str, following_id: str):
+  return db.query(Follow).filter(Follow.follower_id == follower_id, Follow.following_id == following_id).first()
+
 def follow_user(db: Session, follower_id: str, following_id: str):
   if follower_id == following_id: return None
-  existing = db.query(Follow).filter(Follow.follower_id == follower_id, Follow.following_id == following_id).first()
+  existing = get_follow(db, follower_id, following_id)
   if existing: return existing
   follow = Follow(follower_id=follower_id, following_id=following_id)
   db.add(follow)
-  follower_profile = db.query(UserProfile).filter(UserProfile.user_id == follower_id).first()
-  following_profile = db.query(UserProfile).filter(UserProfile.user_id == following_id).first()
-  if follower_profile: follower_profile.following_count += 1
-  if following_profile: following_profile.followers_count += 1
+  bump(db, UserProfile.following_count, UserProfile.user_id, follower_id, 1)
+  bump(db, UserProfile.followers_count, UserProfile.user_id, following_id, 1)
+  feed_repo.backfill(db, follower_id, following_id)
   db.commit()
+  graph_repo.record_follow(follower_id, following_id)
+  principal_cache.invalidate(follower_id)
+  principal_cache.invalidate(following_id)
   db.refresh(follow)
   return follow
 
 def unfollow_user(db: Session, follower_id: str, following_id: str):
-  follow = db.query(Follow).filter(Follow.follower_id == follower_id, Follow.following_id == following_id).first()
+  follow = get_follow(db, follower_id, following_id)
   if not follow: return False
   db.delete(follow)
-  follower_profile = db.query(UserProfile).filter(UserProfile.user_id == follower_id).first()
-  following_profile = db.query(UserProfile).filter(UserProfile.user_id == following_id).first()
-  if follower_profile: follower_profile.following_count = max(0, follower_profile.following_count - 1)
-  if following_profile: following_profile.followers_count = max(0, following_profile.followers_count - 1)
+  bump(db, UserProfile.following_count, UserProfile.user_id, follower_id, -1)
+  bump(db, UserProfile.followers_count, UserProfile.user_id, following_id, -1)
+  feed_repo.drop_actor(db, follower_id, following_id)
   db.commit()
+  graph_repo.record_unfollow(follower_id, following_id)
+  principal_cache.invalidate(follower_id)
+  principal_cache.invalidate(following_id)
   return True
 
-def get_followers(db: Session, user_id: str, skip: int = 0, limit: int = 50):
-  return db.query(Follow).filter(Follow.following_id == user_id).offset(skip).limit(limit).all()
+def _follow_list(db: Session, user_id: str, listed, anchor, viewer_id: Optional[str], skip: int, limit: int, cursor: Optional[str]):
+  viewer = aliased(Follow)
+  viewer_follows = viewer.follower_id.isnot(None) if viewer_id else literal(None)
+  query = db.query(UserProfile, Follow.created_at, listed, viewer_follows.label("viewer_follows")).options(
+    load_only(UserProfile.user_id, UserProfile.username, UserProfile.display_name, UserProfile.photo_url, UserProfile.is_curator)
+  ).join(Follow, listed == UserProfile.user_id).filter(anchor == user_id)
+  if viewer_id: query = query.outerjoin(viewer, and_(viewer.follower_id == viewer_id, viewer.following_id == UserProfile.user_id))
+  page = paginate(query, [Follow.created_at, listed], cursor, skip, limit, descending=True)
+  return page._replace(items=[{"user": row[0], "followed_at": row.created_at, "viewer_follows": row.viewer_follows} for row in page.items])
+
+def get_followers(db: Session, user_id: str, skip: int = 0, limit: int = 50, cursor: Optional[str] = None, viewer_id: Optional[str] = None):
+  return _follow_list(db, user_id, Follow.follower_id, Follow.following_id, viewer_id, skip, limit, cursor)
 
-def get_following(db: Session, user_id: str, skip: int = 0, limit: int = 50):
-  return db.query(Follow).filter(Follow.follower_id == user_id).offset(skip).limit(limit).all()
\ No newline at end of file
+def get_following(db: Session, user_id: str, skip: int = 0, limit: int = 50, cursor: Optional[str] = None, viewer_id: Optional[str] = None):
+  return _follow_list(db, user_id, Follow.following_id, Follow.follower_id, viewer_id, skip, limit, cursor)
\ No newline at end of file
@@ -1,59 +1,75 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from ..database import get_db
-from ..schema.feature import AlbumCreate, AlbumUpdate, Album
-from ..repo.feature_repo import get_album, get_albums, create_album, update_album, delete_album
-from ..core.dependency import require_admin
+from ..database import get_async_db
+from ..schema.feature import AlbumCreate, AlbumUpdate, Album, AlbumDetail
+from ..repo.async_repo import get_album, get_albums, get_albums_by_ids, search_albums, create_album, update_album, delete_album
+from ..core.dependency import require_admin, expansions
+from ..core.pagination import page_response
+from ..core.config import settings
+from ..core.http_cache import etag, versions, conditional
 
 router = APIRouter(prefix="/albums")
 
 @router.get("/", response_model=List[Album])
-def list_albums(skip: int = 0, limit: int = Query(50, le=100), search: Optional[str] = None, db: Session = Depends(get_db)):
+async def list_albums(skip: int = 0, limit: int = Query(50, le=100), search: Optional[str] = None, cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
   """Get all albums with optional search"""
-  albums = get_albums(db, skip, limit)
-  if search:
-    search_lower = search.lower()
-    albums = [a for a in albums if search_lower in (a.title_lowercase or "")]
+  if not (search and search.strip()):
+    return page_response(await get_albums(db, skip, limit, cursor))
+  albums = await search_albums(db, search, skip, limit)
   for album in albums:
     album.artist_ids = [a.id for a in album.artists]
   return albums
 
-@router.get("/{album_id}", response_model=Album)
-def read_album(album_id: str, db: Session = Depends(get_db)):
-  """Get specific album by ID"""
-  album = get_album(db, album_id)
+@router.get("/batch", response_model=List[Album])
+async def batch_albums(ids: List[str] = Query(..., max_length=settings.MAX_BATCH_IDS), db: AsyncSession = Depends(get_async_db)):
+  """Get many albums by ID in one call, in the order requested"""
+  albums = await get_albums_by_ids(db, ids)
+  for album in albums:
+    album.artist_ids = [a.id for a in album.artists]
+  return albums
+
+@router.get("/{album_id}", response_model=AlbumDetail)
+async def read_album(album_id: str, request: Request, response: Response, expand: frozenset = Depends(expansions("tracks", "artists")), db: AsyncSession = Depends(get_async_db)):
+  """Get specific album by ID, optionally embedding its tracks and artists"""
+  album = await get_album(db, album_id, expand)
   if not album:
     raise HTTPException(status_code=404, detail="Album not found")
+  tracks = getattr(album, "tracks", None) or []
+  tag = etag("album", sorted(expand), versions(album), versions(*album.artists), versions(*tracks), versions(*[a for s in tracks for a in s.artists]))
+  cached = conditional(request, response, tag, settings.CATALOG_CACHE_CONTROL)
+  if cached: return cached
   album.artist_ids = [a.id for a in album.artists]
+  for song in tracks:
+    song.artist_ids = [a.id for a in song.artists]
   return album
 
 @router.post("/", response_model=Album)
-def add_album(album: AlbumCreate, db: Session = Depends(get_db), user = Depends(require_admin)):
+async def add_album(album: AlbumCreate, db: AsyncSession = Depends(get_async_db), user = Depends(require_admin)):
   """Create new album (Admin only)"""
   data = album.dict()
   artist_ids = data.pop("artist_ids", [])
   if not data.get("title_lowercase"):
     data["title_lowercase"] = data["title"].lower()
-  created = create_album(db, artist_ids=artist_ids, **data)
+  created = await create_album(db, artist_ids=artist_ids, **data)
   created.artist_ids = [a.id for a in created.artists]
   return created
 
 @router.put("/{album_id}", response_model=Album)
-def modify_album(album_id: str, album: AlbumUpdate, db: Session = Depends(get_db), user = Depends(require_admin)):
+async def modify_album(album_id: str, album: AlbumUpdate, db: AsyncSession = Depends(get_async_db), user = Depends(require_admin)):
   """Update album (Admin only)"""
   data = album.dict(exclude_unset=True)
   artist_ids = data.pop("artist_ids", None)
-  updated = update_album(db, album_id, artist_ids=artist_ids, **data)
+  updated = await update_album(db, album_id, artist_ids=artist_ids, **data)
   if not updated:
     raise HTTPException(status_code=404, detail="Album not found")
   updated.artist_ids = [a.id for a in updated.artists]
   return updated
 
 @router.delete("/{album_id}")
-def remove_album(album_id: str, db: Session = Depends(get_db), user = Depends(require_admin)):
+async def remove_album(album_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(require_admin)):
   """Delete album (Admin only)"""
-  success = delete_album(db, album_id)
+  success = await delete_album(db, album_id)
   if not success:
     raise HTTPException(status_code=404, detail="Album not found")
   return {"message": "Album deleted successfully"}
\ No newline at end of file
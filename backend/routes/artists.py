@@ -1,49 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from ..database import get_db
-from ..schema.feature import ArtistCreate, ArtistUpdate, Artist
-from ..repo.feature_repo import get_artist, get_artists, create_artist, update_artist, delete_artist
-from ..core.dependency import require_admin
+from ..database import get_async_db
+from ..schema.feature import ArtistCreate, ArtistUpdate, Artist, ArtistDetail, SimilarArtist
+from ..repo.async_repo import get_artist, get_artists, get_artists_by_ids, search_artists, create_artist, update_artist, delete_artist, get_similar_artists
+from ..core.dependency import require_admin, expansions
+from ..core.pagination import page_response
+from ..core.config import settings
+from ..core.http_cache import etag, versions, conditional
 
 router = APIRouter(prefix="/artists")
 
 @router.get("/", response_model=List[Artist])
-def list_artists(skip: int = 0, limit: int = Query(50, le=100), search: Optional[str] = None, db: Session = Depends(get_db)):
+async def list_artists(skip: int = 0, limit: int = Query(50, le=100), search: Optional[str] = None, cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
   """Get all artists with optional search"""
-  artists = get_artists(db, skip, limit)
-  if search:
-    search_lower = search.lower()
-    artists = [a for a in artists if search_lower in (a.name_lowercase or "")]
+  if not (search and search.strip()):
+    return page_response(await get_artists(db, skip, limit, cursor))
+  artists = await search_artists(db, search, skip, limit)
   return artists
 
-@router.get("/{artist_id}", response_model=Artist)
-def read_artist(artist_id: str, db: Session = Depends(get_db)):
-  """Get specific artist by ID"""
-  artist = get_artist(db, artist_id)
+@router.get("/batch", response_model=List[Artist])
+async def batch_artists(ids: List[str] = Query(..., max_length=settings.MAX_BATCH_IDS), db: AsyncSession = Depends(get_async_db)):
+  """Get many artists by ID in one call, in the order requested"""
+  artists = await get_artists_by_ids(db, ids)
+  return artists
+
+@router.get("/{artist_id}/similar", response_model=List[SimilarArtist])
+async def similar_artists(artist_id: str, limit: int = Query(20, le=50), db: AsyncSession = Depends(get_async_db)):
+  """Get artists related by collaborations, shared genres and shared listeners"""
+  return await get_similar_artists(db, artist_id, limit)
+
+@router.get("/{artist_id}", response_model=ArtistDetail)
+async def read_artist(artist_id: str, request: Request, response: Response, expand: frozenset = Depends(expansions("songs", "albums")), db: AsyncSession = Depends(get_async_db)):
+  """Get specific artist by ID, optionally embedding their songs and albums"""
+  artist = await get_artist(db, artist_id, expand)
   if not artist:
     raise HTTPException(status_code=404, detail="Artist not found")
+  items = (getattr(artist, "expanded_songs", None) or []) + (getattr(artist, "expanded_albums", None) or [])
+  cached = conditional(request, response, etag("artist", sorted(expand), versions(artist), versions(*items)), settings.CATALOG_CACHE_CONTROL)
+  if cached: return cached
+  for item in items:
+    item.artist_ids = [a.id for a in item.artists]
   return artist
 
 @router.post("/", response_model=Artist)
-def add_artist(artist: ArtistCreate, db: Session = Depends(get_db), user = Depends(require_admin)):
+async def add_artist(artist: ArtistCreate, db: AsyncSession = Depends(get_async_db), user = Depends(require_admin)):
   """Create new artist (Admin only)"""
   if not artist.name_lowercase:
     artist.name_lowercase = artist.name.lower()
-  return create_artist(db, **artist.dict())
+  return await create_artist(db, **artist.dict())
 
 @router.put("/{artist_id}", response_model=Artist)
-def modify_artist(artist_id: str, artist: ArtistUpdate, db: Session = Depends(get_db), user = Depends(require_admin)):
+async def modify_artist(artist_id: str, artist: ArtistUpdate, db: AsyncSession = Depends(get_async_db), user = Depends(require_admin)):
   """Update artist (Admin only)"""
-  updated = update_artist(db, artist_id, **artist.dict(exclude_unset=True))
+  updated = await update_artist(db, artist_id, **artist.dict(exclude_unset=True))
   if not updated:
     raise HTTPException(status_code=404, detail="Artist not found")
   return updated
 
 @router.delete("/{artist_id}")
-def remove_artist(artist_id: str, db: Session = Depends(get_db), user = Depends(require_admin)):
+async def remove_artist(artist_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(require_admin)):
   """Delete artist (Admin only)"""
-  success = delete_artist(db, artist_id)
+  success = await delete_artist(db, artist_id)
   if not success:
     raise HTTPException(status_code=404, detail="Artist not found")
   return {"message": "Artist deleted successfully"}
\ No newline at end of file
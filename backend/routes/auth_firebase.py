@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from firebase_admin import auth as firebase_auth
-from sqlalchemy.orm import Session
-from ..database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from ..database import get_async_db
 from ..core.jwt import create_access_token, create_refresh_token
-from ..repo.user_repo import get_user_by_id, create_user
+from ..repo.async_repo import get_user_by_id, create_user
 
 router = APIRouter(prefix="/auth")
 
@@ -17,15 +18,15 @@ class TokenOut(BaseModel):
   token_type: str = "bearer"
 
 @router.post("/firebase", response_model=TokenOut)
-def auth_via_firebase(payload: FirebaseTokenIn, db: Session = Depends(get_db)):
+async def auth_via_firebase(payload: FirebaseTokenIn, db: AsyncSession = Depends(get_async_db)):
   try:
-    decoded = firebase_auth.verify_id_token(payload.id_token)
+    decoded = await run_in_threadpool(firebase_auth.verify_id_token, payload.id_token)
   except Exception:
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Firebase token")
   uid, email, name, picture = decoded.get("uid"), decoded.get("email"), decoded.get("name"), decoded.get("picture")
-  user = get_user_by_id(db, uid)
+  user = await get_user_by_id(db, uid)
   if not user:
     username = email.split("@")[0] if email else uid
-    user = create_user(db, id=uid, email=email, display_name=name, photo_url=picture, username=username)
-  access, refresh = create_access_token(subject=uid), create_refresh_token(subject=uid)
+    user = await create_user(db, id=uid, email=email, display_name=name, photo_url=picture, username=username)
+  access, refresh = create_access_token(subject=uid, version=user.version), create_refresh_token(subject=uid)
   return {"access_token": access, "refresh_token": refresh}
\ No newline at end of file
@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, EmailStr
-from sqlalchemy.orm import Session
-from ..database import get_db
-from ..repo.user_repo import get_user_by_email, create_user_with_password
-from ..core.security import verify_password
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
+from ..repo.async_repo import get_user_by_email, create_user_with_password, update_user
+from ..core.security import HashingBusy, hash_password_async, verify_password_async, needs_rehash
 from ..core.jwt import create_access_token, create_refresh_token
 
 router = APIRouter(prefix="/auth")
@@ -23,19 +23,37 @@ class TokenOut(BaseModel):
   refresh_token: str
   token_type: str = "bearer"
 
+async def _hashing(job):
+  try:
+    return await job
+  except HashingBusy:
+    raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Authentication is busy, try again shortly", headers={"Retry-After": "1"})
+
 @router.post("/local/register", response_model=TokenOut)
-def register(payload: RegisterIn, db: Session = Depends(get_db)):
-  existing = get_user_by_email(db, payload.email)
+async def register(payload: RegisterIn, db: AsyncSession = Depends(get_async_db)):
+  existing = await get_user_by_email(db, payload.email)
   if existing:
     raise HTTPException(status_code=400, detail="Email already registered")
-  user = create_user_with_password(db, id=payload.id, email=payload.email, password=payload.password, username=payload.username)
-  access, refresh = create_access_token(subject=user.id), create_refresh_token(subject=user.id)
+  await db.close()
+  hashed = await _hashing(hash_password_async(payload.password))
+  user = await create_user_with_password(db, id=payload.id, email=payload.email, password_hash=hashed, username=payload.username)
+  access, refresh = create_access_token(subject=user.id, version=user.version), create_refresh_token(subject=user.id)
   return {"access_token": access, "refresh_token": refresh}
 
 @router.post("/local/login", response_model=TokenOut)
-def login(payload: LoginIn, db: Session = Depends(get_db)):
-  user = get_user_by_email(db, payload.email)
-  if not user or not verify_password(payload.password, user.password_hash):
+async def login(payload: LoginIn, db: AsyncSession = Depends(get_async_db)):
+  user = await get_user_by_email(db, payload.email)
+  if not user or not user.password_hash:
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+  user_id, password_hash, version = user.id, user.password_hash, user.version
+  await db.close()
+  if not await _hashing(verify_password_async(payload.password, password_hash)):
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-  access, refresh = create_access_token(subject=user.id), create_refresh_token(subject=user.id)
-  return {"access_token": access, "refresh_token": refresh}
\ No newline at end of file
+  if needs_rehash(password_hash):
+    try:
+      rehashed = await hash_password_async(payload.password)
+      updated = await update_user(db, user_id, password_hash=rehashed)
+      if updated: version = updated.version
+    except HashingBusy: pass
+  access, refresh = create_access_token(subject=user_id, version=version), create_refresh_token(subject=user_id)
+  return {"access_token": access, "refresh_token": refresh}
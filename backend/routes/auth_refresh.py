@@ -1,5 +1,8 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
+from ..repo.async_repo import get_user_version
 from ..core.jwt import verify_token, create_access_token
 
 router = APIRouter(prefix="/auth")
@@ -12,10 +15,13 @@ class TokenOut(BaseModel):
   token_type: str = "bearer"
 
 @router.post("/refresh", response_model=TokenOut)
-def refresh_token(payload: RefreshIn):
+async def refresh_token(payload: RefreshIn, db: AsyncSession = Depends(get_async_db)):
   payload_data = verify_token(payload.refresh_token)
   if not payload_data or payload_data.get("type") != "refresh":
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
   user_id = payload_data.get("sub")
-  access = create_access_token(subject=user_id)
+  version = await get_user_version(db, user_id)
+  if version is None:
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+  access = create_access_token(subject=user_id, version=version)
   return {"access_token": access}
\ No newline at end of file
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from ..database import get_async_db
+from ..schema.feature import FeedEntry
+from ..repo.async_repo import get_feed
+from ..core.dependency import get_current_user
+from ..core.pagination import with_cursor
+
+router = APIRouter(prefix="/feed")
+
+@router.get("/", response_model=List[FeedEntry])
+async def read_feed(response: Response, limit: int = Query(20, le=50), cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db), user = Depends(get_current_user)):
+  """Get recent reviews and likes from users the current user follows"""
+  return with_cursor(response, await get_feed(db, user.id, cursor, limit))
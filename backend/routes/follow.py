@@ -1,55 +1,71 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from ..database import get_async_db
 from ..schema.feature import Follow, FollowCreate
-from ..repo.user_repo import follow_user, unfollow_user, get_followers, get_following
-from ..core.dependency import get_current_user
+from ..schema.user import UserCard, FollowEntry, FollowSuggestion
+from ..repo.async_repo import follow_user, unfollow_user, get_followers, get_following, get_follow, get_user_profile
+from ..repo.async_repo import get_relationship, get_mutuals, get_suggestions
+from ..core.dependency import get_current_user, get_optional_user
+from ..core.pagination import with_cursor
 
 router = APIRouter(prefix="/follows")
 
 @router.post("/", response_model=Follow)
-def add_follow(follow: FollowCreate, db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def add_follow(follow: FollowCreate, db: AsyncSession = Depends(get_async_db), user = Depends(get_current_user)):
   """Follow a user"""
   if follow.follower_id != user.id:
     raise HTTPException(status_code=403, detail="Cannot follow on behalf of another user")
   if follow.follower_id == follow.following_id:
     raise HTTPException(status_code=400, detail="Cannot follow yourself")
-  result = follow_user(db, follow.follower_id, follow.following_id)
+  result = await follow_user(db, follow.follower_id, follow.following_id)
   if not result:
     raise HTTPException(status_code=400, detail="Already following this user")
   return result
 
 @router.delete("/{following_id}")
-def remove_follow(following_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def remove_follow(following_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_current_user)):
   """Unfollow a user"""
-  success = unfollow_user(db, user.id, following_id)
+  success = await unfollow_user(db, user.id, following_id)
   if not success:
     raise HTTPException(status_code=404, detail="Follow relationship not found")
   return {"message": "Unfollowed successfully"}
 
-@router.get("/followers/{user_id}", response_model=List[Follow])
-def list_followers(user_id: str, skip: int = 0, limit: int = Query(50, le=100), db: Session = Depends(get_db)):
-  """Get all followers of a user"""
-  return get_followers(db, user_id, skip, limit)
+@router.get("/followers/{user_id}", response_model=List[FollowEntry])
+async def list_followers(user_id: str, response: Response, skip: int = 0, limit: int = Query(50, le=100), cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db), viewer = Depends(get_optional_user)):
+  """Get all followers of a user as user cards, flagging the ones the viewer follows"""
+  return with_cursor(response, await get_followers(db, user_id, skip, limit, cursor, viewer.id if viewer else None))
 
-@router.get("/following/{user_id}", response_model=List[Follow])
-def list_following(user_id: str, skip: int = 0, limit: int = Query(50, le=100), db: Session = Depends(get_db)):
-  """Get all users that a user is following"""
-  return get_following(db, user_id, skip, limit)
+@router.get("/following/{user_id}", response_model=List[FollowEntry])
+async def list_following(user_id: str, response: Response, skip: int = 0, limit: int = Query(50, le=100), cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db), viewer = Depends(get_optional_user)):
+  """Get all users that a user is following as user cards, flagging the ones the viewer follows"""
+  return with_cursor(response, await get_following(db, user_id, skip, limit, cursor, viewer.id if viewer else None))
 
 @router.get("/check/{user_id}")
-def check_follow(user_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def check_follow(user_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_current_user)):
   """Check if current user is following another user"""
-  from backend.models.user import Follow
-  follow = db.query(Follow).filter(Follow.follower_id == user.id, Follow.following_id == user_id).first()
+  follow = await get_follow(db, user.id, user_id)
   return {"following": follow is not None}
 
+@router.get("/relationship/{user_id}")
+async def relationship(user_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_current_user)):
+  """Check whether the current user follows a user and whether they follow back"""
+  return {"user_id": user_id, **await get_relationship(db, user.id, user_id)}
+
+@router.get("/mutuals/{user_id}", response_model=List[UserCard])
+async def list_mutuals(user_id: str, limit: int = Query(20, le=100), db: AsyncSession = Depends(get_async_db), user = Depends(get_current_user)):
+  """Get accounts the current user follows that also follow a user"""
+  return await get_mutuals(db, user.id, user_id, limit)
+
+@router.get("/suggestions", response_model=List[FollowSuggestion])
+async def list_suggestions(limit: int = Query(20, le=100), db: AsyncSession = Depends(get_async_db), user = Depends(get_current_user)):
+  """Suggest accounts followed by the people the current user follows"""
+  return await get_suggestions(db, user.id, limit)
+
 @router.get("/stats/{user_id}")
-def follow_stats(user_id: str, db: Session = Depends(get_db)):
+async def follow_stats(user_id: str, db: AsyncSession = Depends(get_async_db)):
   """Get follow statistics for a user"""
-  from backend.models.user import UserProfile
-  profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+  profile = await get_user_profile(db, user_id)
   if not profile:
     raise HTTPException(status_code=404, detail="User not found")
   return {
@@ -1,54 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
-from ..schema.feature import LikeCreate, Like
-from ..repo.feature_repo import get_like, get_likes_by_user, create_like, delete_like
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from ..database import get_async_db
+from ..schema.feature import LikeCreate, Like, LikeCheck, LikeStatus
+from ..repo.async_repo import get_like, get_like_by_id, get_likes_by_user, create_like, delete_like, check_likes
 from ..core.dependency import get_current_user
+from ..core.pagination import with_cursor
 
 router = APIRouter(prefix="/likes")
 
 @router.get("/user/{user_id}", response_model=List[Like])
-def list_user_likes(user_id: str, skip: int = 0, limit: int = Query(50, le=100), db: Session = Depends(get_db)):
+async def list_user_likes(user_id: str, response: Response, skip: int = 0, limit: int = Query(50, le=100), cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
   """Get all likes by a specific user"""
-  return get_likes_by_user(db, user_id, skip, limit)
+  return with_cursor(response, await get_likes_by_user(db, user_id, skip, limit, cursor))
 
 @router.get("/check/{entity_type}/{entity_id}")
-def check_like(entity_type: str, entity_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def check_like(entity_type: str, entity_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_current_user)):
   """Check if current user has liked an entity"""
-  like = get_like(db, user.id, entity_id, entity_type)
-  return {"liked": like is not None, "like_id": like.id if like else None}
+  like_id = (await check_likes(db, user.id, [(entity_type, entity_id)]))[(entity_type, entity_id)]
+  return {"liked": like_id is not None, "like_id": like_id}
+
+@router.post("/check", response_model=List[LikeStatus])
+async def check_many_likes(body: LikeCheck, db: AsyncSession = Depends(get_async_db), user = Depends(get_current_user)):
+  """Check which of many entities the current user has liked"""
+  refs = [(item.entity_type, item.entity_id) for item in body.items]
+  found = await check_likes(db, user.id, refs)
+  return [{"entity_type": t, "entity_id": i, "liked": found[(t, i)] is not None, "like_id": found[(t, i)]} for t, i in refs]
 
 @router.post("/", response_model=Like)
-def add_like(like: LikeCreate, db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def add_like(like: LikeCreate, db: AsyncSession = Depends(get_async_db), user = Depends(get_current_user)):
   """Create new like"""
   if like.user_id != user.id:
     raise HTTPException(status_code=403, detail="Cannot create like for another user")
   if like.entity_type not in ["song", "album", "review"]:
     raise HTTPException(status_code=400, detail="Entity type must be 'song', 'album', or 'review'")
-  existing = get_like(db, like.user_id, like.entity_id, like.entity_type)
+  existing = await get_like(db, like.user_id, like.entity_id, like.entity_type)
   if existing:
     raise HTTPException(status_code=400, detail="Already liked this entity")
-  return create_like(db, **like.dict())
+  return await create_like(db, **like.dict())
 
 @router.delete("/{like_id}")
-def remove_like(like_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def remove_like(like_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_current_user)):
   """Remove like (owner only)"""
-  like = db.query(Like).filter(Like.id == like_id).first()
+  like = await get_like_by_id(db, like_id)
   if not like:
     raise HTTPException(status_code=404, detail="Like not found")
   if like.user_id != user.id:
     raise HTTPException(status_code=403, detail="Not authorized to remove this like")
-  success = delete_like(db, like_id)
+  success = await delete_like(db, like_id)
   if not success:
     raise HTTPException(status_code=404, detail="Like not found")
   return {"message": "Like removed successfully"}
 
 @router.delete("/entity/{entity_type}/{entity_id}")
-def remove_like_by_entity(entity_type: str, entity_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def remove_like_by_entity(entity_type: str, entity_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_current_user)):
   """Unlike an entity"""
-  like = get_like(db, user.id, entity_id, entity_type)
+  like = await get_like(db, user.id, entity_id, entity_type)
   if not like:
     raise HTTPException(status_code=404, detail="Like not found")
-  success = delete_like(db, like.id)
+  success = await delete_like(db, like.id)
   return {"message": "Like removed successfully"}
\ No newline at end of file
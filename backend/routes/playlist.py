@@ -1,46 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from datetime import datetime, timezone
-from ..database import get_db
-from ..schema.feature import PlaylistCreate, PlaylistUpdate, Playlist
-from ..repo.feature_repo import get_playlist, get_playlists_by_user, create_playlist, update_playlist, delete_playlist
+from ..database import get_async_db
+from ..schema.feature import PlaylistCreate, PlaylistUpdate, Playlist, PlaylistSummary, PlaylistSongsAdd, PlaylistSongMove
+from ..repo.async_repo import get_playlist, get_playlists_by_user, create_playlist, update_playlist, delete_playlist
+from ..repo.async_repo import append_playlist_songs, remove_playlist_song, move_playlist_song
 from ..core.dependency import get_current_user
+from ..core.pagination import with_cursor
 
 router = APIRouter(prefix="/playlists")
 
-@router.get("/user/{user_id}", response_model=List[Playlist])
-def list_user_playlists(user_id: str, skip: int = 0, limit: int = Query(50, le=100), db: Session = Depends(get_db)):
-  """Get all playlists for a specific user"""
-  playlists = get_playlists_by_user(db, user_id, skip, limit)
-  for pl in playlists:
-    pl.song_ids = [s.id for s in pl.songs]
+@router.get("/user/{user_id}", response_model=List[PlaylistSummary])
+async def list_user_playlists(user_id: str, response: Response, skip: int = 0, limit: int = Query(50, le=100), cursor: Optional[str] = None, full: bool = False, db: AsyncSession = Depends(get_async_db)):
+  """Get all playlists for a specific user as summaries; `full=true` also lists song IDs"""
+  playlists = with_cursor(response, await get_playlists_by_user(db, user_id, skip, limit, cursor, songs=full))
+  if full:
+    for pl in playlists:
+      pl.song_ids = [s.id for s in pl.songs]
   return playlists
 
 @router.get("/{playlist_id}", response_model=Playlist)
-def read_playlist(playlist_id: str, db: Session = Depends(get_db)):
+async def read_playlist(playlist_id: str, db: AsyncSession = Depends(get_async_db)):
   """Get specific playlist by ID"""
-  playlist = get_playlist(db, playlist_id)
+  playlist = await get_playlist(db, playlist_id)
   if not playlist:
     raise HTTPException(status_code=404, detail="Playlist not found")
   playlist.song_ids = [s.id for s in playlist.songs]
   return playlist
 
 @router.post("/", response_model=Playlist)
-def add_playlist(playlist: PlaylistCreate, db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def add_playlist(playlist: PlaylistCreate, db: AsyncSession = Depends(get_async_db), user = Depends(get_current_user)):
   """Create new playlist"""
   if playlist.user_id != user.id:
     raise HTTPException(status_code=403, detail="Cannot create playlist for another user")
   data = playlist.dict()
   song_ids = data.pop("song_ids", [])
-  created = create_playlist(db, song_ids=song_ids, **data)
+  created = await create_playlist(db, song_ids=song_ids, **data)
   created.song_ids = [s.id for s in created.songs]
   return created
 
 @router.put("/{playlist_id}", response_model=Playlist)
-def modify_playlist(playlist_id: str, playlist: PlaylistUpdate, db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def modify_playlist(playlist_id: str, playlist: PlaylistUpdate, db: AsyncSession = Depends(get_async_db), user = Depends(get_current_user)):
   """Update playlist (owner only)"""
-  existing = get_playlist(db, playlist_id)
+  existing = await get_playlist(db, playlist_id, songs=False)
   if not existing:
     raise HTTPException(status_code=404, detail="Playlist not found")
   if existing.user_id != user.id:
@@ -48,17 +51,49 @@ def modify_playlist(playlist_id: str, playlist: PlaylistUpdate, db: Session = De
   data = playlist.dict(exclude_unset=True)
   data["updated_at"] = datetime.now(timezone.utc)
   song_ids = data.pop("song_ids", None)
-  updated = update_playlist(db, playlist_id, song_ids=song_ids, **data)
+  updated = await update_playlist(db, playlist_id, song_ids=song_ids, **data)
   updated.song_ids = [s.id for s in updated.songs]
   return updated
 
+async def _owned_playlist(db: AsyncSession, playlist_id: str, user):
+  existing = await get_playlist(db, playlist_id, songs=False)
+  if not existing:
+    raise HTTPException(status_code=404, detail="Playlist not found")
+  if existing.user_id != user.id:
+    raise HTTPException(status_code=403, detail="Not authorized to edit this playlist")
+  return existing
+
+@router.post("/{playlist_id}/songs")
+async def add_playlist_songs(playlist_id: str, body: PlaylistSongsAdd, db: AsyncSession = Depends(get_async_db), user = Depends(get_current_user)):
+  """Append songs to the end of a playlist (owner only)"""
+  await _owned_playlist(db, playlist_id, user)
+  added = await append_playlist_songs(db, playlist_id, body.song_ids)
+  return {"message": f"{added} songs added to playlist", "added": added}
+
+@router.delete("/{playlist_id}/songs/{song_id}")
+async def remove_song_from_playlist(playlist_id: str, song_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_current_user)):
+  """Remove a song from a playlist (owner only)"""
+  await _owned_playlist(db, playlist_id, user)
+  if not await remove_playlist_song(db, playlist_id, song_id):
+    raise HTTPException(status_code=404, detail="Song not in playlist")
+  return {"message": "Song removed from playlist"}
+
+@router.put("/{playlist_id}/songs/{song_id}/position")
+async def move_song_in_playlist(playlist_id: str, song_id: str, body: PlaylistSongMove, db: AsyncSession = Depends(get_async_db), user = Depends(get_current_user)):
+  """Move a song to just after `after_song_id`, or to the top when omitted (owner only)"""
+  await _owned_playlist(db, playlist_id, user)
+  position = await move_playlist_song(db, playlist_id, song_id, body.after_song_id)
+  if position is None:
+    raise HTTPException(status_code=404, detail="Song not in playlist")
+  return {"message": "Song moved", "position": position}
+
 @router.delete("/{playlist_id}")
-def remove_playlist(playlist_id: str, db: Session = Depends(get_db), user = Depends(get_current_user)):
+async def remove_playlist(playlist_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(get_current_user)):
   """Delete playlist (owner only)"""
-  existing = get_playlist(db, playlist_id)
+  existing = await get_playlist(db, playlist_id, songs=False)
   if not existing:
     raise HTTPException(status_code=404, detail="Playlist not found")
   if existing.user_id != user.id:
     raise HTTPException(status_code=403, detail="Not authorized to delete this playlist")
-  delete_playlist(db, playlist_id)
+  await delete_playlist(db, playlist_id)
   return {"message": "Playlist deleted successfully"}
\ No newline at end of file
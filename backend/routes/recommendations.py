@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from ..database import get_async_db
+from ..schema.feature import Recommendation
+from ..repo.async_repo import get_similar_items, get_recommendations
+from ..core.dependency import get_current_user
+
+router = APIRouter(prefix="/recommendations")
+
+def _with_artist_ids(recommendations):
+  for rec in recommendations:
+    item = rec.get("song") or rec.get("album")
+    item.artist_ids = [a.id for a in item.artists]
+  return recommendations
+
+@router.get("/for-you/{entity_type}", response_model=List[Recommendation])
+async def recommended_for_user(entity_type: str, limit: int = Query(20, le=50), db: AsyncSession = Depends(get_async_db), user = Depends(get_current_user)):
+  """Get songs or albums similar to what the current user recently liked, each tagged with the like that earned it"""
+  if entity_type not in ["song", "album"]:
+    raise HTTPException(status_code=400, detail="Entity type must be 'song' or 'album'")
+  return _with_artist_ids(await get_recommendations(db, user.id, entity_type, limit))
+
+@router.get("/{entity_type}/{entity_id}/similar", response_model=List[Recommendation])
+async def listeners_also_liked(entity_type: str, entity_id: str, limit: int = Query(20, le=50), db: AsyncSession = Depends(get_async_db)):
+  """Get the songs or albums most often liked by the same listeners"""
+  if entity_type not in ["song", "album"]:
+    raise HTTPException(status_code=400, detail="Entity type must be 'song' or 'album'")
+  return _with_artist_ids(await get_similar_items(db, entity_type, entity_id, limit))
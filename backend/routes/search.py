@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from ..database import get_async_db
+from ..schema.feature import SearchHit
+from ..repo.async_repo import search_all
+
+router = APIRouter(prefix="/search")
+
+@router.get("/", response_model=List[SearchHit])
+async def search(q: str = Query(..., min_length=1), per_type: int = Query(5, ge=1, le=20), limit: int = Query(20, le=50), db: AsyncSession = Depends(get_async_db)):
+  """Search users, artists, albums and songs in one ranked list"""
+  if not q.strip():
+    return []
+  return await search_all(db, q, per_type, limit)
@@ -1,59 +1,71 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from ..database import get_db
-from ..schema.feature import SongCreate, SongUpdate, Song
-from ..repo.feature_repo import get_song, get_songs, create_song, update_song, delete_song
+from ..database import get_async_db
+from ..schema.feature import SongCreate, SongUpdate, Song, SongDetail
+from ..repo.async_repo import get_song, get_songs, get_songs_by_ids, search_songs, create_song, update_song, delete_song
 from ..core.dependency import require_admin
+from ..core.pagination import page_response
+from ..core.config import settings
+from ..core.http_cache import etag, versions, conditional
 
 router = APIRouter(prefix="/songs")
 
 @router.get("/", response_model=List[Song])
-def list_songs(skip: int = 0, limit: int = Query(50, le=100), search: Optional[str] = None, db: Session = Depends(get_db)):
+async def list_songs(skip: int = 0, limit: int = Query(50, le=100), search: Optional[str] = None, cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
   """Get all songs with optional search"""
-  songs = get_songs(db, skip, limit)
-  if search:
-    search_lower = search.lower()
-    songs = [s for s in songs if search_lower in (s.title_lowercase or "")]
+  if not (search and search.strip()):
+    return page_response(await get_songs(db, skip, limit, cursor))
+  songs = await search_songs(db, search, skip, limit)
   for song in songs:
     song.artist_ids = [a.id for a in song.artists]
   return songs
 
-@router.get("/{song_id}", response_model=Song)
-def read_song(song_id: str, db: Session = Depends(get_db)):
+@router.get("/batch", response_model=List[Song])
+async def batch_songs(ids: List[str] = Query(..., max_length=settings.MAX_BATCH_IDS), db: AsyncSession = Depends(get_async_db)):
+  """Get many songs by ID in one call, in the order requested"""
+  songs = await get_songs_by_ids(db, ids)
+  for song in songs:
+    song.artist_ids = [a.id for a in song.artists]
+  return songs
+
+@router.get("/{song_id}", response_model=SongDetail)
+async def read_song(song_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
   """Get specific song by ID"""
-  song = get_song(db, song_id)
+  song = await get_song(db, song_id)
   if not song:
     raise HTTPException(status_code=404, detail="Song not found")
+  cached = conditional(request, response, etag("song", versions(song)), settings.CATALOG_CACHE_CONTROL)
+  if cached: return cached
   song.artist_ids = [a.id for a in song.artists]
   return song
 
 @router.post("/", response_model=Song)
-def add_song(song: SongCreate, db: Session = Depends(get_db), user = Depends(require_admin)):
+async def add_song(song: SongCreate, db: AsyncSession = Depends(get_async_db), user = Depends(require_admin)):
   """Create new song (Admin only)"""
   data = song.dict()
   artist_ids = data.pop("artist_ids", [])
   if not data.get("title_lowercase"):
     data["title_lowercase"] = data["title"].lower()
-  created = create_song(db, artist_ids=artist_ids, **data)
+  created = await create_song(db, artist_ids=artist_ids, **data)
   created.artist_ids = [a.id for a in created.artists]
   return created
 
 @router.put("/{song_id}", response_model=Song)
-def modify_song(song_id: str, song: SongUpdate, db: Session = Depends(get_db), user = Depends(require_admin)):
+async def modify_song(song_id: str, song: SongUpdate, db: AsyncSession = Depends(get_async_db), user = Depends(require_admin)):
   """Update song (Admin only)"""
   data = song.dict(exclude_unset=True)
   artist_ids = data.pop("artist_ids", None)
-  updated = update_song(db, song_id, artist_ids=artist_ids, **data)
+  updated = await update_song(db, song_id, artist_ids=artist_ids, **data)
   if not updated:
     raise HTTPException(status_code=404, detail="Song not found")
   updated.artist_ids = [a.id for a in updated.artists]
   return updated
 
 @router.delete("/{song_id}")
-def remove_song(song_id: str, db: Session = Depends(get_db), user = Depends(require_admin)):
+async def remove_song(song_id: str, db: AsyncSession = Depends(get_async_db), user = Depends(require_admin)):
   """Delete song (Admin only)"""
-  success = delete_song(db, song_id)
+  success = await delete_song(db, song_id)
   if not success:
     raise HTTPException(status_code=404, detail="Song not found")
   return {"message": "Song deleted successfully"}
\ No newline at end of file
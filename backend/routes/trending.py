@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from ..database import get_async_db
+from ..schema.feature import Artist, Album, Song
+from ..repo.async_repo import get_trending
+
+router = APIRouter(prefix="/trending")
+
+@router.get("/songs", response_model=List[Song])
+async def trending_songs(limit: int = Query(20, le=100), db: AsyncSession = Depends(get_async_db)):
+  """Get songs ranked by time-decayed likes and reviews"""
+  songs = await get_trending(db, "song", limit)
+  for song in songs:
+    song.artist_ids = [a.id for a in song.artists]
+  return songs
+
+@router.get("/albums", response_model=List[Album])
+async def trending_albums(limit: int = Query(20, le=100), db: AsyncSession = Depends(get_async_db)):
+  """Get albums ranked by time-decayed likes and reviews"""
+  albums = await get_trending(db, "album", limit)
+  for album in albums:
+    album.artist_ids = [a.id for a in album.artists]
+  return albums
+
+@router.get("/artists", response_model=List[Artist])
+async def trending_artists(limit: int = Query(20, le=100), db: AsyncSession = Depends(get_async_db)):
+  """Get artists ranked by engagement with their songs and albums"""
+  return await get_trending(db, "artist", limit)
@@ -1,2 +1,2 @@
-from .user import User, UserProfile, UserProfileUpdate
-from .feature import Artist, Album, Song, Playlist, Review, Like, Follow
\ No newline at end of file
+from .user import User, UserProfile, UserProfileUpdate, UserCard, FollowEntry, FollowSuggestion
+from .feature import Artist, SimilarArtist, Album, Song, SongDetail, AlbumDetail, ArtistDetail, Playlist, PlaylistSummary, Review, Like, Follow, SearchHit, FeedEntry, Recommendation
\ No newline at end of file
@@ -1,6 +1,8 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict
 from datetime import datetime
+from .user import UserCard
+from ..core.config import settings
 
 class ArtistBase(BaseModel):
   name: str
@@ -29,6 +31,9 @@ class Artist(ArtistBase):
   id: str
   model_config = ConfigDict(from_attributes=True)
 
+class SimilarArtist(Artist):
+  similarity: float
+
 class AlbumBase(BaseModel):
   title: str
   title_lowercase: Optional[str] = None
@@ -95,6 +100,21 @@ class Song(SongBase):
   artist_ids: Optional[List[str]] = None
   model_config = ConfigDict(from_attributes=True)
 
+class RatingStats(BaseModel):
+  average_rating: Optional[float] = None
+  rating_histogram: List[int] = [0, 0, 0, 0, 0]
+
+class SongDetail(Song, RatingStats):
+  pass
+
+class AlbumDetail(Album, RatingStats):
+  artists: Optional[List[Artist]] = Field(None, validation_alias="expanded_artists")
+  tracks: Optional[List[Song]] = None
+
+class ArtistDetail(Artist):
+  songs: Optional[List[Song]] = Field(None, validation_alias="expanded_songs")
+  albums: Optional[List[Album]] = Field(None, validation_alias="expanded_albums")
+
 class PlaylistBase(BaseModel):
   title: str
   description: Optional[str] = None
@@ -123,6 +143,17 @@ class Playlist(PlaylistBase):
   user_id: str
   model_config = ConfigDict(from_attributes=True)
 
+class PlaylistSummary(Playlist):
+  song_count: int = 0
+  total_duration: int = 0
+  cover_art_urls: List[str] = []
+
+class PlaylistSongsAdd(BaseModel):
+  song_ids: List[str]
+
+class PlaylistSongMove(BaseModel):
+  after_song_id: Optional[str] = None
+
 class ReviewBase(BaseModel):
   rating: int
   review_text: Optional[str] = None
@@ -146,6 +177,7 @@ class Review(ReviewBase):
   user_id: str
   created_at: datetime
   likes_count: Optional[int] = 0
+  helpful_score: Optional[float] = None
   song_id: Optional[str] = None
   model_config = ConfigDict(from_attributes=True)
 
@@ -168,6 +200,17 @@ class Like(LikeBase):
   created_at: datetime
   model_config = ConfigDict(from_attributes=True)
 
+class LikeRef(BaseModel):
+  entity_type: str
+  entity_id: str
+
+class LikeCheck(BaseModel):
+  items: List[LikeRef] = Field(..., max_length=settings.MAX_BATCH_IDS)
+
+class LikeStatus(LikeRef):
+  liked: bool
+  like_id: Optional[str] = None
+
 class FollowBase(BaseModel):
   created_at: Optional[datetime] = None
 
@@ -178,4 +221,29 @@ class FollowCreate(FollowBase):
 class Follow(FollowBase):
   follower_id: str
   following_id: str
-  model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+  model_config = ConfigDict(from_attributes=True)
+
+class SearchHit(BaseModel):
+  entity_type: str
+  id: str
+  title: str
+  image_url: Optional[str] = None
+  username: Optional[str] = None
+  rank: float
+  model_config = ConfigDict(from_attributes=True)
+
+class FeedEntry(BaseModel):
+  activity_type: str
+  activity_id: str
+  created_at: datetime
+  actor: Optional[UserCard] = None
+  review: Optional[Review] = None
+  like: Optional[Like] = None
+
+class Recommendation(BaseModel):
+  entity_type: str
+  entity_id: str
+  score: float
+  because_id: Optional[str] = None
+  song: Optional[Song] = None
+  album: Optional[Album] = None
\ No newline at end of file
@@ -42,6 +42,22 @@ class UserProfileUpdate(BaseModel):
   favorite_song_ids: Optional[List[str]] = None
   favorite_album_ids: Optional[List[str]] = None
 
+class UserCard(BaseModel):
+  user_id: str
+  username: str
+  display_name: Optional[str] = None
+  photo_url: Optional[str] = None
+  is_curator: Optional[bool] = False
+  model_config = ConfigDict(from_attributes=True)
+
+class FollowEntry(BaseModel):
+  user: UserCard
+  followed_at: Optional[datetime] = None
+  viewer_follows: Optional[bool] = None
+
+class FollowSuggestion(UserCard):
+  overlap: int
+
 class UserProfile(UserProfileBase):
   user_id: str
   model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,33 @@
+"""Rebuild the item-to-item similarity table that backs the recommendation and similar-artist endpoints.
+
+Reads every like and warm review, builds the sparse user x item matrix per entity type and stores each item's
+top RECS_TOP_N cosine neighbors; artists are compared on collaborations, genres and likers instead. Run it
+offline (cron, after a bulk import); serving only reads the result. Catalog edits queue the artists whose links
+changed, and --if-queued rebuilds artists only when that queue is non-empty, so it can run from a frequent cron.
+
+  python -m backend.scripts.build_recommendations [--if-queued] [song|album|artist ...]
+"""
+import sys, time
+from ..database import SessionLocal
+from ..repo.recommendation_repo import RECOMMENDABLE, build_item_similarities
+from ..repo.artist_similarity_repo import build_artist_similarities, refresh_queued
+
+ENTITY_TYPES = (*RECOMMENDABLE, "artist")
+
+def main(entity_types, if_queued: bool = False) -> int:
+  db = SessionLocal()
+  try:
+    for entity_type in entity_types:
+      started = time.monotonic()
+      if entity_type == "artist": built = refresh_queued(db) if if_queued else build_artist_similarities(db)
+      else: built = build_item_similarities(db, entity_type)
+      print(f"{entity_type}: {built} items in {time.monotonic() - started:.1f}s")
+  finally:
+    db.close()
+  return 0
+
+if __name__ == "__main__":
+  args = [a for a in sys.argv[1:] if a != "--if-queued"]
+  unknown = set(args) - set(ENTITY_TYPES)
+  if unknown: sys.exit(f"unknown entity types: {', '.join(sorted(unknown))}")
+  sys.exit(main(args or ENTITY_TYPES, "--if-queued" in sys.argv[1:]))
@@ -0,0 +1,24 @@
+from backend.core.cache import LikedSet, TTLCache
+
+def test_fills_are_dropped_only_by_writes_to_the_same_key():
+  cache = TTLCache(maxsize=2, ttl=60)
+  a, b = cache.epoch("a"), cache.epoch("b")
+  cache.invalidate("b")
+  cache.set("a", 1, a)
+  cache.set("b", 2, b)
+  assert cache.get("a") == 1 and cache.get("b") is None
+  c = cache.epoch("c")
+  for key in ["d", "e", "c"]: cache.invalidate(key)
+  cache.invalidate("f")
+  cache.set("c", 3, c)
+  assert cache.get("c") is None
+
+def test_update_swaps_in_a_new_liked_set():
+  cache = TTLCache(maxsize=10, ttl=60)
+  cache.set("u", LikedSet([("song", "s2", "l2")]))
+  before = cache.get("u")
+  cache.update("u", lambda liked: liked.added("song", "s1", "l1"))
+  after = cache.get("u")
+  assert before.get("song", "s1") is None and after.get("song", "s1") == "l1" and after.get("song", "s2") == "l2"
+  cache.update("u", lambda liked: liked.discarded("song", "s2"))
+  assert after.get("song", "s2") == "l2" and cache.get("u").get("song", "s2") is None
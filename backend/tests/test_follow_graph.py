@@ -0,0 +1,32 @@
+import asyncio
+from types import SimpleNamespace
+from backend.repo import graph_repo
+
+class FakeSession:
+  scans = 0
+  def __init__(self, edges, started): self.edges, self.started = edges, started
+  async def __aenter__(self): return self
+  async def __aexit__(self, *exc): return False
+  async def execute(self, stmt):
+    FakeSession.scans += 1
+    self.started.set()
+    await asyncio.sleep(0.05)
+    return SimpleNamespace(all=lambda: list(self.edges))
+
+def test_cold_builds_are_single_flight_and_replay_follows(monkeypatch):
+  started = asyncio.Event()
+  monkeypatch.setattr(graph_repo, "AsyncSessionLocal", lambda: FakeSession([("a", "b")], started))
+  monkeypatch.setattr(graph_repo, "_graph", None)
+  FakeSession.scans = 0
+
+  async def scenario():
+    first = asyncio.ensure_future(graph_repo.get_graph())
+    second = asyncio.ensure_future(graph_repo.get_graph())
+    await started.wait()
+    graph_repo.record_follow("c", "a")
+    return await first, await second
+
+  first, second = asyncio.run(scenario())
+  assert first is second
+  assert FakeSession.scans == 1
+  assert first.follows("a", "b") and first.follows("c", "a")
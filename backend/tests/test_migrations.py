@@ -0,0 +1,11 @@
+from backend.main import migration_head
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+import os
+
+def test_migrations_form_a_single_chain():
+  script = ScriptDirectory.from_config(Config(os.path.join(os.path.dirname(__file__), "..", "alembic.ini")))
+  assert len(script.get_heads()) == 1
+  revisions = list(script.walk_revisions())
+  assert revisions[-1].down_revision is None
+  assert revisions[0].revision == migration_head()
@@ -0,0 +1,55 @@
+from typing import List
+import pytest
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from backend import schema
+from backend.core.pagination import CURSOR_HEADER, Page, page_response
+from backend.models import Artist, Album, Song
+from backend.repo.feature_repo import _projection
+
+ROWS = {
+  schema.Artist: [
+    {"name": "Sigur Rós", "name_lowercase": "sigur rós", "image_url": None, "cover_image_url": None, "genres": ["post-rock"],
+     "bio": "Línea \"quoted\" \n newline", "socials": {"x": "@sigurros"}, "platform_links": None, "id": "a1"},
+  ],
+  schema.Album: [
+    {"title": "Ágætis byrjun", "title_lowercase": "ágætis byrjun", "release_date": "1999-06-12", "cover_art_url": None, "genre": None,
+     "associated_film": None, "platform_links": {"spotify": "https://open.spotify.com/album/x"}, "tracklist": ["s1", "s2"],
+     "review_count": 0, "likes_count": 12, "id": "al1", "artist_ids": ["a1"]},
+  ],
+  schema.Song: [
+    {"title": "Svefn-g-englar", "title_lowercase": "svefn-g-englar", "album_id": "al1", "duration": 604, "release_date": None,
+     "genre": "post-rock", "credits": {"producer": ["Ken Thomas"], "nested": {"n": 1.5}}, "cover_art_url": None, "platform_links": None,
+     "review_count": 3, "likes_count": 0, "id": "s1", "artist_ids": []},
+    {"title": "日本語", "title_lowercase": "日本語", "album_id": None, "duration": 1, "release_date": "2024", "genre": None, "credits": None,
+     "cover_art_url": "https://img/🎵.png", "platform_links": {}, "review_count": 0, "likes_count": 0, "id": "s2", "artist_ids": ["a1", "a2"]},
+  ],
+}
+
+PROJECTIONS = {schema.Artist: lambda: _projection(Artist, schema.Artist), schema.Album: lambda: _projection(Album, schema.Album, artist_ids=Album.id),
+               schema.Song: lambda: _projection(Song, schema.Song, artist_ids=Song.id)}
+
+def _response_model_body(response_schema, rows) -> bytes:
+  adapter = TypeAdapter(List[response_schema])
+  return JSONResponse(adapter.dump_python(adapter.validate_python(rows), mode="json")).body
+
+@pytest.mark.parametrize("response_schema", list(PROJECTIONS), ids=lambda s: s.__name__)
+def test_projection_labels_follow_schema_fields(response_schema):
+  assert [column.name for column in PROJECTIONS[response_schema]()] == list(response_schema.model_fields)
+
+def test_projection_applies_scalar_defaults():
+  sql = str(select(*PROJECTIONS[schema.Song]()).compile(dialect=postgresql.dialect()))
+  assert "coalesce(songs.review_count" in sql and "coalesce(songs.likes_count" in sql
+  assert "coalesce(songs.title" not in sql
+
+@pytest.mark.parametrize("response_schema", list(ROWS), ids=lambda s: s.__name__)
+def test_page_response_matches_response_model_bytes(response_schema):
+  rows = ROWS[response_schema]
+  assert list(rows[0]) == list(response_schema.model_fields)
+  assert page_response(Page(rows)).body == _response_model_body(response_schema, rows)
+
+def test_page_response_sets_cursor_header():
+  assert page_response(Page([], "abc")).headers[CURSOR_HEADER] == "abc"
+  assert CURSOR_HEADER not in page_response(Page([])).headers
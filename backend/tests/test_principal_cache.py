@@ -0,0 +1,30 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from fastapi.security import HTTPAuthorizationCredentials
+from backend.core import dependency
+from backend.core.cache import principal_cache
+from backend.core.jwt import create_access_token
+
+def test_cached_principal_is_reused_until_a_newer_version_token(monkeypatch):
+  row = SimpleNamespace(id="u1", email=None, role="user", created_at=datetime.now(timezone.utc), profile=None, version=1)
+  loads = []
+  async def get_user_by_id(db, user_id):
+    loads.append(user_id)
+    return SimpleNamespace(**vars(row))
+  monkeypatch.setattr(dependency, "get_user_by_id", get_user_by_id)
+  principal_cache.clear()
+  current = lambda version: asyncio.run(dependency.get_current_user(
+    HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token("u1", version)), None
+  ))
+
+  assert current(1).role == "user"
+  assert current(1).role == "user"
+  assert current(None).role == "user"
+  assert len(loads) == 1
+  # promoted through another worker: tokens issued from then on carry the bumped version
+  row.role, row.version = "admin", 2
+  assert current(1).role == "user"
+  assert current(2).role == "admin"
+  assert current(1).role == "admin"
+  assert len(loads) == 2
@@ -0,0 +1,112 @@
+"""Fail when a hot repo query plans a sequential scan.
+
+Needs TEST_DATABASE_URL pointing at a disposable Postgres migrated to head. Each test seeds a realistic volume of
+rows and ANALYZEs them inside a transaction that is rolled back afterwards, runs one repo call, captures the SQL it
+issues and EXPLAINs every SELECT, so the planner judges the indexes against real statistics.
+"""
+import json, os
+import pytest
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from backend.main import migration_head
+from backend.core.pagination import encode_cursor
+from backend.repo import feature_repo, user_repo, feed_repo, search_repo, recommendation_repo, artist_similarity_repo
+
+URL = os.environ.get("TEST_DATABASE_URL")
+pytestmark = pytest.mark.skipif(not URL, reason="TEST_DATABASE_URL is not set")
+
+USERS, ARTISTS, ALBUMS, SONGS = 5000, 2000, 5000, 50000
+
+SEED = [
+  f"INSERT INTO users (id, role) SELECT 'u' || g, 'user' FROM generate_series(1, {USERS}) g",
+  f"INSERT INTO user_profiles (user_id, username, display_name) SELECT 'u' || g, 'user' || g, 'User ' || g FROM generate_series(1, {USERS}) g",
+  f"""INSERT INTO follows (follower_id, following_id, created_at)
+    SELECT 'u' || g, 'u' || ((g * 7 + k) % {USERS} + 1), now() - g * interval '1 minute'
+    FROM generate_series(1, {USERS}) g, generate_series(1, 10) k WHERE (g * 7 + k) % {USERS} + 1 <> g ON CONFLICT DO NOTHING""",
+  f"INSERT INTO artists (id, name, name_lowercase, genres) SELECT 'ar' || g, 'Artist ' || g, 'artist ' || g, ARRAY['genre' || g % 40] FROM generate_series(1, {ARTISTS}) g",
+  f"INSERT INTO albums (id, title, title_lowercase) SELECT 'al' || g, 'Album ' || g, 'album ' || g FROM generate_series(1, {ALBUMS}) g",
+  f"INSERT INTO album_artists (album_id, artist_id) SELECT 'al' || g, 'ar' || (g % {ARTISTS} + 1) FROM generate_series(1, {ALBUMS}) g",
+  f"""INSERT INTO songs (id, title, title_lowercase, album_id, duration)
+    SELECT 's' || g, 'Song ' || g, 'song ' || g, 'al' || (g % {ALBUMS} + 1), 180 FROM generate_series(1, {SONGS}) g""",
+  f"INSERT INTO song_artists (song_id, artist_id) SELECT 's' || g, 'ar' || (g % {ARTISTS} + 1) FROM generate_series(1, {SONGS}) g",
+  f"""INSERT INTO reviews (id, user_id, rating, created_at, entity_id, entity_type, song_id, likes_count)
+    SELECT 'r' || g, 'u' || (g % {USERS} + 1), g % 5 + 1, now() - g * interval '1 minute', 's' || (g % {SONGS} + 1), 'song', 's' || (g % {SONGS} + 1), g % 13
+    FROM generate_series(1, 50000) g""",
+  f"""INSERT INTO likes (id, user_id, entity_id, entity_type, created_at)
+    SELECT 'l' || g, 'u' || (g % {USERS} + 1), 's' || (g * 31 % {SONGS} + 1), 'song', now() - g * interval '1 minute'
+    FROM generate_series(1, 100000) g ON CONFLICT DO NOTHING""",
+  f"INSERT INTO playlists (id, user_id, title, created_at) SELECT 'p' || g, 'u' || (g % {USERS} + 1), 'Playlist ' || g, now() FROM generate_series(1, 5000) g",
+  f"""INSERT INTO playlist_songs (playlist_id, song_id, position)
+    SELECT 'p' || (g % 5000 + 1), 's' || g, g * 1024 FROM generate_series(1, {SONGS}) g""",
+  f"""INSERT INTO feed_items (user_id, activity_type, activity_id, actor_id, created_at)
+    SELECT 'u' || (g % {USERS} + 1), 'review', 'r' || g, 'u' || (g % 97 + 1), now() - g * interval '1 minute' FROM generate_series(1, 50000) g""",
+  f"""INSERT INTO item_similarities (entity_type, entity_id, similar_ids, scores)
+    SELECT 'song', 's' || g, ARRAY['s' || (g + 1), 's' || (g + 2)], ARRAY[0.5, 0.25] FROM generate_series(1, {SONGS} - 2) g""",
+  f"""INSERT INTO item_similarities (entity_type, entity_id, similar_ids, scores)
+    SELECT 'artist', 'ar' || g, ARRAY['ar' || (g % {ARTISTS} + 1)], ARRAY[0.5] FROM generate_series(1, {ARTISTS}) g""",
+  f"UPDATE user_profiles SET feed_pulled = true WHERE user_id IN (SELECT 'u' || g FROM generate_series(1, {USERS}, 500) g)",
+  "ANALYZE",
+]
+
+CASES = {
+  "reviews by entity": lambda db: feature_repo.get_reviews_by_entity(db, "s1", "song"),
+  "most liked reviews": lambda db: feature_repo.get_reviews_by_entity(db, "s1", "song", sort="liked"),
+  "helpful reviews": lambda db: feature_repo.get_reviews_by_entity(db, "s1", "song", sort="helpful"),
+  "reviews by user": lambda db: feature_repo.get_reviews_by_user(db, "u1"),
+  "likes by user": lambda db: feature_repo.get_likes_by_user(db, "u1"),
+  "like lookup": lambda db: feature_repo.get_like(db, "u1", "s1", "song"),
+  "followers": lambda db: user_repo.get_followers(db, "u1"),
+  "following": lambda db: user_repo.get_following(db, "u1"),
+  "playlists by user": lambda db: feature_repo.get_playlists_by_user(db, "u1"),
+  "album with tracks": lambda db: feature_repo.get_album(db, "al1", {"tracks", "artists"}),
+  "artist with catalog": lambda db: feature_repo.get_artist(db, "ar1", {"songs", "albums"}),
+  "song page": lambda db: feature_repo.get_songs(db, cursor=encode_cursor(["song 5", "s5"])),
+  "song search": lambda db: feature_repo.search_songs(db, "love"),
+  "global search": lambda db: search_repo.search_all(db, "love"),
+  "feed": lambda db: feed_repo.get_feed(db, "u1"),
+  "similar songs": lambda db: recommendation_repo.get_similar_items(db, "song", "s1"),
+  "recommended songs": lambda db: recommendation_repo.get_recommendations(db, "u1", "song"),
+  "similar artists": lambda db: artist_similarity_repo.get_similar_artists(db, "ar1"),
+}
+
+@pytest.fixture(scope="module")
+def engine():
+  engine = create_engine(URL)
+  with engine.connect() as conn:
+    current = MigrationContext.configure(conn).get_current_revision()
+  if current != migration_head(): pytest.fail(f"TEST_DATABASE_URL is at revision {current}, migrate it to {migration_head()} first")
+  yield engine
+  engine.dispose()
+
+@pytest.fixture
+def seeded(engine):
+  with engine.connect() as conn:
+    outer = conn.begin()
+    for statement in SEED: conn.exec_driver_sql(statement)
+    db = Session(bind=conn, join_transaction_mode="create_savepoint")
+    try: yield conn, db
+    finally:
+      db.close()
+      outer.rollback()
+
+def _seq_scans(node, found):
+  if node.get("Node Type") == "Seq Scan": found.add(node.get("Relation Name"))
+  for child in node.get("Plans", []): _seq_scans(child, found)
+  return found
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_hot_query_uses_indexes(seeded, name):
+  conn, db = seeded
+  captured = []
+  def capture(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip().upper().startswith(("SELECT", "WITH")): captured.append((statement, parameters))
+  event.listen(conn, "before_cursor_execute", capture)
+  try: CASES[name](db)
+  finally: event.remove(conn, "before_cursor_execute", capture)
+  assert captured
+  scanned = set()
+  for statement, parameters in captured:
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+    _seq_scans((json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"], scanned)
+  assert not scanned, f"seq scan on {', '.join(sorted(scanned))}"